@@ -115,7 +115,8 @@ disown
 # Extract context from the new project (read-only, no writes to .claude/)
 CONTEXT=""
 if command -v uv &>/dev/null; then
-    CONTEXT=$(uv run "${PLUGIN_ROOT}/scripts/extract-context.py" "${NEW_ROOT}" 2>/dev/null || echo "")
+    # --tree: a project switch always wants the structure, even with a fresh narrative
+    CONTEXT=$(uv run "${PLUGIN_ROOT}/scripts/extract-context.py" "${NEW_ROOT}" --tree 2>/dev/null || echo "")
 fi
 
 # Check if repo-map DB exists (read-only)
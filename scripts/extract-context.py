@@ -9,108 +9,205 @@ Extract key context from narrative and project structure for Claude orientation.
 Outputs JSON with:
 - project_root: absolute path
 - top_dirs: top-level directory structure
+- dir_tree: directory tree (like `tree -L 3`)
 - narrative_summary: Summary section from narrative.md
 - narrative_foci: Current Foci section
 - narrative_dragons: Dragons & Gotchas section
+
+top_dirs/dir_tree require a filesystem walk, so by default they are only
+computed when narrative.md is missing or older than 7 days. Pass --tree /
+--no-tree to force the walk on or off.
 """
 
 import json
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Directories that are pure noise for orientation (mirrors get_dir_tree's skip set)
+SKIP_DIR_NAMES = {'.git', 'node_modules', '__pycache__', '.venv', 'venv',
+                  'dist', 'build', 'target', '.tox', '.pytest_cache', '.mypy_cache'}
+
+# Stop counting files in a single top-level dir past this; absurd trees
+# shouldn't dominate runtime
+MAX_COUNTED_FILES = 50000
+
+
+# Splits markdown into alternating heading/body parts in one pass
+SECTION_SPLIT = re.compile(r"^## (.+?)\s*\n", re.MULTILINE)
+
+
+def parse_sections(content: str) -> dict[str, str]:
+    """Split markdown into {heading: body} with a single scan."""
+    parts = SECTION_SPLIT.split(content)
+    # parts[0] is the preamble; then heading, body, heading, body, ...
+    return {heading: body.strip()
+            for heading, body in zip(parts[1::2], parts[2::2])}
 
-def extract_section(content: str, section_name: str, max_chars: int = 500) -> str:
-    """Extract a section from markdown by heading, with truncation."""
-    # Match ## Section Name through next ## or end
-    pattern = rf"^## {re.escape(section_name)}\s*\n(.*?)(?=^## |\Z)"
-    match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-    if match:
-        text = match.group(1).strip()
-        if len(text) > max_chars:
-            # Truncate at word boundary
-            truncated = text[:max_chars].rsplit(' ', 1)[0]
-            return truncated + "..."
-        return text
-    return ""
 
+def truncate_section(text: str, max_chars: int = 500) -> str:
+    """Truncate section text at a word boundary."""
+    if len(text) > max_chars:
+        truncated = text[:max_chars].rsplit(' ', 1)[0]
+        return truncated + "..."
+    return text
+
+
+def count_files(path: str) -> int | str:
+    """Count files under a directory, pruning noise dirs.
+
+    Uses os.scandir so is_file()/is_dir() come from d_type with no extra
+    stat per entry. Returns "50000+" if the cap is hit.
+    """
+    count = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or entry.name in SKIP_DIR_NAMES:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        count += 1
+                        if count >= MAX_COUNTED_FILES:
+                            return f"{MAX_COUNTED_FILES}+"
+        except OSError:
+            pass
+    return count
 
-def get_dir_tree(project_root: Path, max_depth: int = 2) -> str:
+
+def get_top_dirs(project_root: Path) -> list[dict]:
+    """Get top-level directories with file counts."""
+    try:
+        with os.scandir(project_root) as entries:
+            dirs = sorted((e for e in entries
+                           if e.is_dir(follow_symlinks=False)
+                           and not e.name.startswith('.')
+                           and e.name not in SKIP_DIR_NAMES),
+                          key=lambda e: e.name.lower())
+    except OSError:
+        return []
+
+    # Counting is syscall-bound, so overlap the per-directory walks;
+    # map() keeps results in the same sorted order
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        counts = pool.map(count_files, (e.path for e in dirs))
+        return [{"name": e.name, "files": c} for e, c in zip(dirs, counts)]
+
+
+def get_dir_tree(project_root: Path, max_depth: int = 2, max_lines: int = 28) -> str:
     """Get directory tree with depth limit, similar to `tree -L 2`."""
     lines = []
+    truncated = False
 
-    def walk(path: Path, prefix: str = "", depth: int = 0):
-        if depth > max_depth:
+    def walk(path: str, prefix: str = "", depth: int = 0):
+        nonlocal truncated
+        if depth > max_depth or truncated:
             return
         try:
-            items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-            # Filter hidden, cache dirs, and common noise
-            skip_names = {'.', '__pycache__', 'node_modules', '.git', 'venv', '.venv',
-                         'dist', 'build', '.tox', '.pytest_cache', '.mypy_cache',
-                         'target', '.cargo', '*.egg-info'}
-            items = [i for i in items if not i.name.startswith('.')
-                     and i.name not in skip_names
-                     and not i.name.endswith('.egg-info')]
-            if len(items) > 10 and depth > 0:
-                items = items[:8]
-                items.append(None)  # Marker for "..."
-
-            for i, item in enumerate(items):
-                is_last = (i == len(items) - 1)
-                connector = "└── " if is_last else "├── "
-
-                if item is None:
-                    lines.append(f"{prefix}{connector}...")
-                    continue
-
-                if item.is_dir():
-                    lines.append(f"{prefix}{connector}{item.name}/")
-                    extension = "    " if is_last else "│   "
-                    walk(item, prefix + extension, depth + 1)
-                else:
-                    lines.append(f"{prefix}{connector}{item.name}")
-        except:
-            pass
+            with os.scandir(path) as it:
+                # DirEntry.is_dir uses d_type: no extra stat per entry
+                items = sorted(it, key=lambda e: (not e.is_dir(follow_symlinks=False),
+                                                  e.name.lower()))
+        except OSError:
+            return
+
+        # Filter hidden, cache dirs, and common noise
+        items = [i for i in items if not i.name.startswith('.')
+                 and i.name not in SKIP_DIR_NAMES
+                 and not i.name.endswith('.egg-info')]
+        if len(items) > 10 and depth > 0:
+            items = items[:8]
+            items.append(None)  # Marker for "..."
+
+        for i, item in enumerate(items):
+            if len(lines) >= max_lines:
+                truncated = True
+                return
+
+            is_last = (i == len(items) - 1)
+            connector = "└── " if is_last else "├── "
+
+            if item is None:
+                lines.append(f"{prefix}{connector}...")
+                continue
+
+            if item.is_dir(follow_symlinks=False):
+                lines.append(f"{prefix}{connector}{item.name}/")
+                extension = "    " if is_last else "│   "
+                walk(item.path, prefix + extension, depth + 1)
+            else:
+                lines.append(f"{prefix}{connector}{item.name}")
 
     lines.append(f"{project_root.name}/")
-    walk(project_root, "", 0)
+    walk(str(project_root), "", 0)
 
-    # Limit total lines
-    if len(lines) > 30:
-        lines = lines[:28] + ["...", f"({len(lines) - 28} more items)"]
+    if truncated:
+        lines.append("...")
 
     return "\n".join(lines)
 
 
 def main():
-    if len(sys.argv) > 1:
-        project_root = Path(sys.argv[1]).resolve()
-    else:
-        project_root = Path.cwd().resolve()
-
-    claude_dir = project_root / ".claude"
-    narrative_file = claude_dir / "narrative.md"
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Extract orientation context for Claude")
+    parser.add_argument("project_root", nargs="?", default=".", help="Project root directory")
+    parser.add_argument("--tree", action=argparse.BooleanOptionalAction, default=None,
+                        help="Force the directory walk on (--tree) or off (--no-tree); "
+                             "by default it runs only when the narrative is missing or stale")
+    args = parser.parse_args()
+
+    # abspath is enough here (and cheaper than resolve's symlink walk)
+    project_root = Path(os.path.abspath(args.project_root))
+
+    narrative_file = project_root / ".claude" / "narrative.md"
+
+    # One stat answers both "does it exist" and "is it fresh"
+    try:
+        narrative_mtime = narrative_file.stat().st_mtime
+    except OSError:
+        narrative_mtime = None
+
+    # The filesystem walk is the expensive part; when a fresh narrative
+    # exists the sections carry the orientation, so skip it by default
+    want_tree = args.tree
+    if want_tree is None:
+        want_tree = (narrative_mtime is None
+                     or (time.time() - narrative_mtime) / 86400 > 7)
 
     result = {
         "project_root": str(project_root),
         "project_name": project_root.name,
-        "dir_tree": get_dir_tree(project_root, max_depth=3),
     }
 
-    if narrative_file.exists():
+    if want_tree:
+        result["top_dirs"] = get_top_dirs(project_root)
+        result["dir_tree"] = get_dir_tree(project_root, max_depth=3)
+
+    if narrative_mtime is not None:
         content = narrative_file.read_text()
         # Truncate sections to prevent context bloat
         # Summary: concise overview (300 chars)
         # Foci: current work areas (400 chars)
         # Dragons: key warnings only (300 chars)
-        result["narrative_summary"] = extract_section(content, "Summary", max_chars=300)
-        result["narrative_foci"] = extract_section(content, "Current Foci", max_chars=400)
-        result["narrative_dragons"] = extract_section(content, "Dragons & Gotchas", max_chars=300)
+        sections = parse_sections(content)
+        result["narrative_summary"] = truncate_section(sections.get("Summary", ""), max_chars=300)
+        result["narrative_foci"] = truncate_section(sections.get("Current Foci", ""), max_chars=400)
+        result["narrative_dragons"] = truncate_section(sections.get("Dragons & Gotchas", ""), max_chars=300)
         result["has_narrative"] = True
     else:
         result["has_narrative"] = False
 
-    print(json.dumps(result, indent=2))
+    # Stream straight to stdout rather than materializing the full string
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
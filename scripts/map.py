@@ -2,6 +2,9 @@
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
+#     "blake3>=0.4",
+#     "orjson>=3.0",
+#     "rapidfuzz>=3.0",
 #     "tree-sitter>=0.23.0",
 #     "tree-sitter-cpp>=0.23.0",
 #     "tree-sitter-rust>=0.23.0",
@@ -22,8 +25,10 @@ import json
 import os
 import sqlite3
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -35,15 +40,34 @@ import tree_sitter_cpp as tscpp
 import tree_sitter_rust as tsrust
 from tree_sitter import Language, Parser, Node
 
+try:
+    # C-accelerated scorer: 20-100x faster than difflib on the O(n²) phase
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+try:
+    # 3-10x faster than stdlib json for the (potentially MBs) cache file
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # ~10x faster than SHA-256 for the change-detection hashes
+    import blake3
+except ImportError:
+    blake3 = None
+
 
 # Cache format version - bump when Symbol structure or file selection changes
-CACHE_VERSION = 6  # v6: Added .mm (Objective-C++) and .metal file support
+CACHE_VERSION = 8  # v8: BLAKE3 content hashes (when available)
 
 # Database schema version - bump when SQLite schema changes
-DB_VERSION = 1  # v1: Initial versioned schema
+DB_VERSION = 6  # v6: NOCASE name index for exact-name lookups
 
 # Default to 50% of available cores for parsing, max 8 workers
-# Using threads (not processes) to avoid memory duplication
+# Using processes so CPU-bound parsing scales past the GIL; workers return
+# plain dicts to keep pickling cheap
 DEFAULT_WORKERS_PERCENT = 50
 MAX_WORKERS = 8
 
@@ -59,6 +83,8 @@ class Symbol:
     line_number: int
     end_line_number: int | None = None  # End line for content extraction
     parent: str | None = None
+    start_byte: int | None = None  # Byte span (whole lines) for content extraction
+    end_byte: int | None = None
 
     @property
     def full_name(self) -> str:
@@ -75,6 +101,9 @@ class Symbol:
     @classmethod
     def from_dict(cls, d: dict) -> "Symbol":
         """Create from dictionary."""
+        # Intern the path: every symbol in a file repeats it, and interning
+        # makes the similarity loop's file_path == check an identity test
+        d = dict(d, file_path=sys.intern(d["file_path"]))
         return cls(**d)
 
 
@@ -129,7 +158,8 @@ class SymbolCache:
         if not self.cache_path.exists():
             return
         try:
-            data = json.loads(self.cache_path.read_text())
+            raw = self.cache_path.read_bytes()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
             if data.get("version") != CACHE_VERSION:
                 return  # Invalidate cache on version mismatch
             self.found_file_count = data.get("found_file_count")
@@ -148,7 +178,7 @@ class SymbolCache:
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
         # Write to temp file then rename for atomicity
         tmp_path = self.cache_path.with_suffix(".tmp")
-        tmp_path.write_text(json.dumps(data))
+        tmp_path.write_bytes(orjson.dumps(data) if orjson else json.dumps(data).encode())
         tmp_path.rename(self.cache_path)
         self._dirty_count = 0
 
@@ -164,22 +194,22 @@ class SymbolCache:
         """
         cached = self.files.get(rel_path)
 
-        # Check if file still exists
-        if not file_path.exists():
+        # One stat answers both existence and mtime; this runs once per file
+        # across the whole tree, so the syscall count matters
+        try:
+            current_mtime = file_path.stat().st_mtime
+        except OSError:
             if cached:
                 del self.files[rel_path]
             return [], False
 
-        current_mtime = file_path.stat().st_mtime
-
         # Fast path: mtime unchanged
         if cached and cached.mtime == current_mtime:
             return cached.symbols, True
 
         # mtime changed - check content hash
         try:
-            content = file_path.read_bytes()
-            current_hash = hashlib.sha256(content).hexdigest()
+            current_hash = hash_bytes(file_path.read_bytes())
         except IOError:
             return [], False
 
@@ -196,20 +226,28 @@ class SymbolCache:
         self.files[rel_path] = FileCache(mtime=mtime, content_hash=content_hash, symbols=symbols)
         self._dirty_count += 1
 
-    def remove_stale(self, valid_paths: set[str]) -> None:
-        """Remove entries for files that no longer exist."""
+    def remove_stale(self, valid_paths: set[str]) -> list[str]:
+        """Remove entries for files that no longer exist. Returns removed paths."""
         stale = [fp for fp in self.files if fp not in valid_paths]
         for fp in stale:
             del self.files[fp]
+        return stale
+
+
+def hash_bytes(content: bytes) -> str:
+    """Hash file contents for change detection (not a security boundary)."""
+    if blake3 is not None:
+        return blake3.blake3(content).hexdigest()
+    return hashlib.sha256(content).hexdigest()
 
 
 def compute_file_hash(file_path: Path) -> str:
-    """Compute SHA256 hash of file contents."""
-    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+    """Compute the change-detection hash of a file's contents."""
+    return hash_bytes(file_path.read_bytes())
 
 
 def get_worker_count(percent: int = DEFAULT_WORKERS_PERCENT) -> int:
-    """Calculate number of worker threads based on CPU count, capped at MAX_WORKERS."""
+    """Calculate number of worker processes based on CPU count, capped at MAX_WORKERS."""
     cores = cpu_count()
     workers = max(1, int(cores * percent / 100))
     return min(workers, MAX_WORKERS)
@@ -222,6 +260,11 @@ def parse_file_worker(args: tuple) -> tuple[str, float, str, list[dict], str]:
     Returns (rel_path, mtime, content_hash, symbols_as_dicts, language).
 
     Note: Returns dicts instead of Symbol objects for pickling.
+
+    Any per-file failure (RecursionError on pathological sources,
+    MemoryError under the rlimit, ...) returns the empty-result tuple so
+    one bad file can't abort the executor.map iteration and silently
+    drop the rest of the batch.
     """
     file_path_str, root_str, language = args
     file_path = Path(file_path_str)
@@ -231,49 +274,62 @@ def parse_file_worker(args: tuple) -> tuple[str, float, str, list[dict], str]:
     try:
         mtime = file_path.stat().st_mtime
         content = file_path.read_bytes()
-        content_hash = hashlib.sha256(content).hexdigest()
-    except IOError:
+        content_hash = hash_bytes(content)
+
+        # Parse based on language, reusing the bytes already read for hashing
+        if language == "python":
+            symbols = extract_symbols_from_python(file_path, root, content)
+        elif language == "cpp":
+            symbols = extract_symbols_from_cpp(file_path, root, content)
+        elif language == "rust":
+            symbols = extract_symbols_from_rust(file_path, root, content)
+        else:
+            symbols = []
+
+        # Convert to dicts for pickling
+        symbol_dicts = [s.to_dict() for s in symbols]
+    except Exception:
         return (rel_path, 0, "", [], language)
 
-    # Parse based on language
-    if language == "python":
-        symbols = extract_symbols_from_python(file_path, root)
-    elif language == "cpp":
-        symbols = extract_symbols_from_cpp(file_path, root)
-    elif language == "rust":
-        symbols = extract_symbols_from_rust(file_path, root)
-    else:
-        symbols = []
-
-    # Convert to dicts for pickling
-    symbol_dicts = [s.to_dict() for s in symbols]
     return (rel_path, mtime, content_hash, symbol_dicts, language)
 
 
-def get_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> str:
-    """Extract function signature including arguments and return type."""
+def get_function_signature(node: ast.FunctionDef | ast.AsyncFunctionDef, seg=None) -> str:
+    """Extract function signature including arguments and return type.
+
+    `seg` slices an expression's text straight out of the source; falling
+    back to ast.unparse (a full pretty-printer) only when offsets are
+    unavailable.
+    """
+    def expr_text(n: ast.expr) -> str:
+        if seg is not None:
+            text = seg(n)
+            if text is not None:
+                return text
+        return ast.unparse(n)
+
     args = []
     for arg in node.args.args:
         arg_str = arg.arg
         if arg.annotation:
-            arg_str += f": {ast.unparse(arg.annotation)}"
+            arg_str += f": {expr_text(arg.annotation)}"
         args.append(arg_str)
 
     if node.args.vararg:
         arg_str = f"*{node.args.vararg.arg}"
         if node.args.vararg.annotation:
-            arg_str += f": {ast.unparse(node.args.vararg.annotation)}"
+            arg_str += f": {expr_text(node.args.vararg.annotation)}"
         args.append(arg_str)
 
     if node.args.kwarg:
         arg_str = f"**{node.args.kwarg.arg}"
         if node.args.kwarg.annotation:
-            arg_str += f": {ast.unparse(node.args.kwarg.annotation)}"
+            arg_str += f": {expr_text(node.args.kwarg.annotation)}"
         args.append(arg_str)
 
     sig = f"{node.name}({', '.join(args)})"
     if node.returns:
-        sig += f" -> {ast.unparse(node.returns)}"
+        sig += f" -> {expr_text(node.returns)}"
     return sig
 
 
@@ -285,17 +341,42 @@ def get_first_line_of_docstring(docstring: str | None) -> str | None:
     return first_line[:97] + "..." if len(first_line) > 100 else first_line
 
 
-def extract_symbols_from_python(file_path: Path, relative_to: Path) -> list[Symbol]:
+def extract_symbols_from_python(file_path: Path, relative_to: Path, source: bytes | None = None) -> list[Symbol]:
     """Extract all functions, classes, and nested functions from a Python file."""
     symbols = []
 
     try:
-        source = file_path.read_text(encoding='utf-8')
+        # ast.parse accepts bytes and handles the encoding declaration itself,
+        # skipping a Python-level decode pass
+        if source is None:
+            source = file_path.read_bytes()
         tree = ast.parse(source, filename=str(file_path))
-    except (SyntaxError, UnicodeDecodeError):
+    except (SyntaxError, UnicodeDecodeError, ValueError, IOError):
         return []
 
-    rel_path = str(file_path.relative_to(relative_to))
+    rel_path = sys.intern(str(file_path.relative_to(relative_to)))
+
+    # Byte offset of each line start: col_offset/end_col_offset are utf-8
+    # byte offsets, so annotation text can be sliced out of the source
+    line_starts = [0]
+    pos = source.find(b'\n')
+    while pos != -1:
+        line_starts.append(pos + 1)
+        pos = source.find(b'\n', pos + 1)
+
+    def line_span(n) -> tuple[int, int]:
+        """Byte span of the node's lines, for direct content reads later."""
+        start = line_starts[n.lineno - 1]
+        end = line_starts[n.end_lineno] if n.end_lineno < len(line_starts) else len(source)
+        return start, end
+
+    def seg(n: ast.expr) -> str | None:
+        try:
+            start = line_starts[n.lineno - 1] + n.col_offset
+            end = line_starts[n.end_lineno - 1] + n.end_col_offset
+        except (AttributeError, IndexError, TypeError):
+            return None
+        return source[start:end].decode('utf-8', 'replace')
 
     def _extract_functions(node_body: list, parent_name: str | None, parent_kind: str | None):
         """Recursively extract functions/methods from a node body."""
@@ -305,12 +386,14 @@ def extract_symbols_from_python(file_path: Path, relative_to: Path) -> list[Symb
                 symbols.append(Symbol(
                     name=item.name,
                     kind=kind,
-                    signature=get_function_signature(item),
+                    signature=get_function_signature(item, seg),
                     docstring=get_first_line_of_docstring(ast.get_docstring(item)),
                     file_path=rel_path,
                     line_number=item.lineno,
                     end_line_number=item.end_lineno,
                     parent=parent_name,
+                    start_byte=line_span(item)[0],
+                    end_byte=line_span(item)[1],
                 ))
                 # Recurse into nested functions
                 _extract_functions(item.body, item.name, "function")
@@ -325,17 +408,21 @@ def extract_symbols_from_python(file_path: Path, relative_to: Path) -> list[Symb
                 file_path=rel_path,
                 line_number=node.lineno,
                 end_line_number=node.end_lineno,
+                start_byte=line_span(node)[0],
+                end_byte=line_span(node)[1],
             ))
             _extract_functions(node.body, node.name, "class")
         elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             symbols.append(Symbol(
                 name=node.name,
                 kind="function",
-                signature=get_function_signature(node),
+                signature=get_function_signature(node, seg),
                 docstring=get_first_line_of_docstring(ast.get_docstring(node)),
                 file_path=rel_path,
                 line_number=node.lineno,
                 end_line_number=node.end_lineno,
+                start_byte=line_span(node)[0],
+                end_byte=line_span(node)[1],
             ))
             # Recurse into nested functions
             _extract_functions(node.body, node.name, "function")
@@ -399,19 +486,26 @@ def node_text(node: Node | None, source: bytes) -> str:
     return source[node.start_byte:node.end_byte].decode("utf-8")
 
 
-def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]:
+def extract_symbols_from_cpp(file_path: Path, relative_to: Path, source: bytes | None = None) -> list[Symbol]:
     """Extract classes, structs, and functions from a C++ file."""
     symbols = []
 
     try:
-        source = file_path.read_text(encoding='utf-8')
-        source_bytes = source.encode()
-    except (UnicodeDecodeError, IOError):
+        # tree-sitter works on bytes; no need to decode then re-encode
+        source_bytes = source if source is not None else file_path.read_bytes()
+    except IOError:
         return []
 
     parser = get_cpp_parser()
     tree = parser.parse(source_bytes)
-    rel_path = str(file_path.relative_to(relative_to))
+    rel_path = sys.intern(str(file_path.relative_to(relative_to)))
+
+    def line_span(node: Node) -> tuple[int, int]:
+        """Byte span of the node's lines, for direct content reads later."""
+        start = source_bytes.rfind(b"\n", 0, node.start_byte) + 1
+        end = source_bytes.find(b"\n", node.end_byte)
+        end = len(source_bytes) if end == -1 else end + 1
+        return start, end
 
     # Use iterative traversal to avoid recursion limit
     stack: list[tuple[Node, str | None]] = [(tree.root_node, None)]
@@ -434,6 +528,8 @@ def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]
                     file_path=rel_path,
                     line_number=node.start_point[0] + 1,
                     end_line_number=node.end_point[0] + 1,
+                    start_byte=line_span(node)[0],
+                    end_byte=line_span(node)[1],
                 ))
                 # Process children with this class as context
                 for child in reversed(node.children):
@@ -455,6 +551,8 @@ def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]
                     file_path=rel_path,
                     line_number=node.start_point[0] + 1,
                     end_line_number=node.end_point[0] + 1,
+                    start_byte=line_span(node)[0],
+                    end_byte=line_span(node)[1],
                 ))
                 for child in reversed(node.children):
                     stack.append((child, name))
@@ -477,6 +575,8 @@ def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]
                         file_path=rel_path,
                         line_number=node.start_point[0] + 1,
                         end_line_number=node.end_point[0] + 1,
+                        start_byte=line_span(node)[0],
+                        end_byte=line_span(node)[1],
                         parent=class_context,
                     ))
                 else:
@@ -488,6 +588,8 @@ def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]
                         file_path=rel_path,
                         line_number=node.start_point[0] + 1,
                         end_line_number=node.end_point[0] + 1,
+                        start_byte=line_span(node)[0],
+                        end_byte=line_span(node)[1],
                     ))
 
         # Method declaration in class (prototype)
@@ -505,6 +607,8 @@ def extract_symbols_from_cpp(file_path: Path, relative_to: Path) -> list[Symbol]
                         file_path=rel_path,
                         line_number=node.start_point[0] + 1,
                         end_line_number=node.end_point[0] + 1,
+                        start_byte=line_span(node)[0],
+                        end_byte=line_span(node)[1],
                         parent=class_context,
                     ))
 
@@ -528,19 +632,26 @@ def extract_cpp_func_name(declarator: Node, source: bytes) -> str:
     return node_text(declarator, source)
 
 
-def extract_symbols_from_rust(file_path: Path, relative_to: Path) -> list[Symbol]:
+def extract_symbols_from_rust(file_path: Path, relative_to: Path, source: bytes | None = None) -> list[Symbol]:
     """Extract structs, enums, and functions from a Rust file."""
     symbols = []
 
     try:
-        source = file_path.read_text(encoding='utf-8')
-        source_bytes = source.encode()
-    except (UnicodeDecodeError, IOError):
+        # tree-sitter works on bytes; no need to decode then re-encode
+        source_bytes = source if source is not None else file_path.read_bytes()
+    except IOError:
         return []
 
     parser = get_rust_parser()
     tree = parser.parse(source_bytes)
-    rel_path = str(file_path.relative_to(relative_to))
+    rel_path = sys.intern(str(file_path.relative_to(relative_to)))
+
+    def line_span(node: Node) -> tuple[int, int]:
+        """Byte span of the node's lines, for direct content reads later."""
+        start = source_bytes.rfind(b"\n", 0, node.start_byte) + 1
+        end = source_bytes.find(b"\n", node.end_byte)
+        end = len(source_bytes) if end == -1 else end + 1
+        return start, end
 
     # Use iterative traversal to avoid recursion limit
     stack: list[tuple[Node, str | None]] = [(tree.root_node, None)]
@@ -562,6 +673,8 @@ def extract_symbols_from_rust(file_path: Path, relative_to: Path) -> list[Symbol
                     file_path=rel_path,
                     line_number=node.start_point[0] + 1,
                     end_line_number=node.end_point[0] + 1,
+                    start_byte=line_span(node)[0],
+                    end_byte=line_span(node)[1],
                 ))
 
         # Enum
@@ -578,6 +691,8 @@ def extract_symbols_from_rust(file_path: Path, relative_to: Path) -> list[Symbol
                     file_path=rel_path,
                     line_number=node.start_point[0] + 1,
                     end_line_number=node.end_point[0] + 1,
+                    start_byte=line_span(node)[0],
+                    end_byte=line_span(node)[1],
                 ))
 
         # Impl block
@@ -611,6 +726,8 @@ def extract_symbols_from_rust(file_path: Path, relative_to: Path) -> list[Symbol
                         file_path=rel_path,
                         line_number=node.start_point[0] + 1,
                         end_line_number=node.end_point[0] + 1,
+                        start_byte=line_span(node)[0],
+                        end_byte=line_span(node)[1],
                         parent=impl_context,
                     ))
                 else:
@@ -622,6 +739,8 @@ def extract_symbols_from_rust(file_path: Path, relative_to: Path) -> list[Symbol
                         file_path=rel_path,
                         line_number=node.start_point[0] + 1,
                         end_line_number=node.end_point[0] + 1,
+                        start_byte=line_span(node)[0],
+                        end_byte=line_span(node)[1],
                     ))
 
         # Add children to stack
@@ -648,9 +767,31 @@ def same_language(sym1: Symbol, sym2: Symbol) -> bool:
     return get_language(sym1.file_path) == get_language(sym2.file_path)
 
 
-def similarity(a: str, b: str) -> float:
+def normalize_name(s: str) -> str:
+    """Normalize a name for comparison (lowercase, underscores stripped)."""
+    return s.lower().replace('_', '')
+
+
+def norm_similarity(a: str, b: str, cutoff: float = 0.0) -> float:
+    """Similarity ratio of two already-normalized strings.
+
+    With a cutoff, pairs that provably score below it return 0.0 without
+    running the full Ratcliff-Obershelp match (filter-verify pattern).
+    """
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=cutoff * 100) / 100.0
+    # autojunk's popularity heuristic only adds overhead on short identifiers
+    sm = SequenceMatcher(None, a, b, autojunk=False)
+    if cutoff:
+        # Cheap upper bounds: length ratio first, then character bag
+        if sm.real_quick_ratio() < cutoff or sm.quick_ratio() < cutoff:
+            return 0.0
+    return sm.ratio()
+
+
+def similarity(a: str, b: str, cutoff: float = 0.0) -> float:
     """Calculate similarity ratio between two strings."""
-    return SequenceMatcher(None, a.lower().replace('_', ''), b.lower().replace('_', '')).ratio()
+    return norm_similarity(normalize_name(a), normalize_name(b), cutoff)
 
 
 # Maximum number of symbols for O(n²) similarity checks.
@@ -658,6 +799,62 @@ def similarity(a: str, b: str) -> float:
 _SIMILARITY_MAX_SYMBOLS = 2000
 
 
+def name_bigrams(norm: str) -> frozenset:
+    """Character bigrams of a normalized name, for cheap pair prefiltering."""
+    return frozenset(norm[i:i+2] for i in range(len(norm) - 1))
+
+
+# MinHash parameters for docstring candidate generation: 32 permutations
+# in 8 bands of 4 rows ≈ 0.6 Jaccard collision threshold
+_MINHASH_PERMS = 32
+_MINHASH_BANDS = 8
+
+
+def docstring_candidates(docs: list[str | None], min_len: int) -> set[tuple[int, int]]:
+    """Find candidate similar-docstring pairs via MinHash banding.
+
+    Comparing every docstring pair with SequenceMatcher is O(n²·L²).
+    Instead, MinHash word-trigram shingles and bucket signatures by band:
+    only pairs that collide in some band are verified with a real ratio().
+    """
+    rows = _MINHASH_PERMS // _MINHASH_BANDS
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+
+    for idx, doc in enumerate(docs):
+        if not doc or len(doc) < min_len:
+            continue
+        words = doc.lower().split()
+        if len(words) < 3:
+            shingles = {' '.join(words)}
+        else:
+            shingles = {' '.join(words[i:i+3]) for i in range(len(words) - 2)}
+        # crc32 is stable across processes, unlike the salted builtin
+        # hash(), so the candidate set (and the committed report) is
+        # reproducible on identical input
+        sig = [min(zlib.crc32(f"{perm}:{s}".encode()) for s in shingles)
+               for perm in range(_MINHASH_PERMS)]
+        for band in range(_MINHASH_BANDS):
+            key = (band, tuple(sig[band * rows:(band + 1) * rows]))
+            buckets[key].append(idx)
+
+    candidates = set()
+    for members in buckets.values():
+        for a in range(len(members) - 1):
+            for b in range(a + 1, len(members)):
+                candidates.add((members[a], members[b]))
+    return candidates
+
+
+def bigrams_can_match(bi1: frozenset, bi2: frozenset, threshold: float) -> bool:
+    """Dice-like upper bound: pairs sharing too few bigrams can't reach the
+    ratio threshold, so skip the expensive similarity call for them."""
+    if not bi1 or not bi2:
+        # Single-char names have no bigrams; let the (cheap) scorer decide
+        # instead of silently skipping identical one-letter names
+        return not bi1 and not bi2
+    return len(bi1 & bi2) / max(len(bi1), len(bi2)) >= threshold * 0.8
+
+
 def find_similar_classes(symbols: list[Symbol], name_threshold: float = 0.75, doc_threshold: float = 0.65) -> list[tuple[Symbol, Symbol, str]]:
     """Find classes with similar names or docstrings (same language only)."""
     classes = [s for s in symbols if s.kind == "class" and not s.name.startswith("Test")]
@@ -665,32 +862,40 @@ def find_similar_classes(symbols: list[Symbol], name_threshold: float = 0.75, do
         return []
 
     similar = []
-    compared = set()
-
-    for i, cls1 in enumerate(classes):
-        for cls2 in classes[i+1:]:
-            if cls1.file_path == cls2.file_path:
-                continue
+    # Normalize once: the inner loop runs O(n²) times
+    norm_names = [normalize_name(c.name) for c in classes]
+    bigrams = [name_bigrams(n) for n in norm_names]
+    doc_pairs = docstring_candidates([c.docstring for c in classes], min_len=30)
+
+    # Group by file: same-file pairs never compare, and the language check
+    # happens once per file pair instead of once per symbol pair
+    by_file: dict[str, list[int]] = defaultdict(list)
+    for idx, s in enumerate(classes):
+        by_file[s.file_path].append(idx)
+    groups = [(get_language(fp), idxs) for fp, idxs in by_file.items()]
+
+    for g, (lang1, idxs1) in enumerate(groups):
+        for lang2, idxs2 in groups[g + 1:]:
             # Skip cross-language comparisons (intentional duplicates for bindings, etc.)
-            if not same_language(cls1, cls2):
-                continue
-            pair_key = tuple(sorted([cls1.location, cls2.location]))
-            if pair_key in compared:
+            if lang1 != lang2:
                 continue
-            compared.add(pair_key)
-
-            reasons = []
-            name_sim = similarity(cls1.name, cls2.name)
-            if name_sim >= name_threshold:
-                reasons.append(f"similar names ({name_sim:.0%})")
-
-            if cls1.docstring and cls2.docstring and len(cls1.docstring) >= 30 and len(cls2.docstring) >= 30:
-                doc_sim = similarity(cls1.docstring, cls2.docstring)
-                if doc_sim >= doc_threshold:
-                    reasons.append(f"similar docstrings ({doc_sim:.0%})")
-
-            if reasons:
-                similar.append((cls1, cls2, ", ".join(reasons)))
+            for i in idxs1:
+                for j in idxs2:
+                    a, b = (i, j) if i < j else (j, i)
+                    cls1, cls2 = classes[a], classes[b]
+
+                    # A name match alone flags the pair; only pay for the docstring
+                    # comparison when the name check didn't fire
+                    if bigrams_can_match(bigrams[a], bigrams[b], name_threshold):
+                        name_sim = norm_similarity(norm_names[a], norm_names[b], name_threshold)
+                        if name_sim >= name_threshold:
+                            similar.append((cls1, cls2, f"similar names ({name_sim:.0%})"))
+                            continue
+
+                    if (a, b) in doc_pairs:
+                        doc_sim = similarity(cls1.docstring, cls2.docstring, doc_threshold)
+                        if doc_sim >= doc_threshold:
+                            similar.append((cls1, cls2, f"similar docstrings ({doc_sim:.0%})"))
 
     return similar
 
@@ -702,32 +907,40 @@ def find_similar_functions(symbols: list[Symbol], name_threshold: float = 0.75,
         return []
 
     similar = []
-    compared = set()
-
-    for i, fn1 in enumerate(functions):
-        for fn2 in functions[i+1:]:
-            if fn1.file_path == fn2.file_path:
-                continue
+    # Normalize once: the inner loop runs O(n²) times
+    norm_names = [normalize_name(f.name) for f in functions]
+    bigrams = [name_bigrams(n) for n in norm_names]
+    doc_pairs = docstring_candidates([f.docstring for f in functions], min_len=20)
+
+    # Group by file: same-file pairs never compare, and the language check
+    # happens once per file pair instead of once per symbol pair
+    by_file: dict[str, list[int]] = defaultdict(list)
+    for idx, s in enumerate(functions):
+        by_file[s.file_path].append(idx)
+    groups = [(get_language(fp), idxs) for fp, idxs in by_file.items()]
+
+    for g, (lang1, idxs1) in enumerate(groups):
+        for lang2, idxs2 in groups[g + 1:]:
             # Skip cross-language comparisons (intentional duplicates for bindings, etc.)
-            if not same_language(fn1, fn2):
-                continue
-            pair_key = tuple(sorted([fn1.location, fn2.location]))
-            if pair_key in compared:
+            if lang1 != lang2:
                 continue
-            compared.add(pair_key)
-
-            reasons = []
-            name_sim = similarity(fn1.name, fn2.name)
-            if name_sim >= name_threshold:
-                reasons.append(f"similar names ({name_sim:.0%})")
-
-            if fn1.docstring and fn2.docstring and len(fn1.docstring) >= 20 and len(fn2.docstring) >= 20:
-                doc_sim = similarity(fn1.docstring, fn2.docstring)
-                if doc_sim >= doc_threshold:
-                    reasons.append(f"similar docstrings ({doc_sim:.0%})")
-
-            if reasons:
-                similar.append((fn1, fn2, ", ".join(reasons)))
+            for i in idxs1:
+                for j in idxs2:
+                    a, b = (i, j) if i < j else (j, i)
+                    fn1, fn2 = functions[a], functions[b]
+
+                    # A name match alone flags the pair; only pay for the docstring
+                    # comparison when the name check didn't fire
+                    if bigrams_can_match(bigrams[a], bigrams[b], name_threshold):
+                        name_sim = norm_similarity(norm_names[a], norm_names[b], name_threshold)
+                        if name_sim >= name_threshold:
+                            similar.append((fn1, fn2, f"similar names ({name_sim:.0%})"))
+                            continue
+
+                    if (a, b) in doc_pairs:
+                        doc_sim = similarity(fn1.docstring, fn2.docstring, doc_threshold)
+                        if doc_sim >= doc_threshold:
+                            similar.append((fn1, fn2, f"similar docstrings ({doc_sim:.0%})"))
 
     return similar
 
@@ -792,13 +1005,53 @@ def write_symbols_to_sqlite(symbols: list[Symbol], db_path: Path) -> None:
             file_path TEXT NOT NULL,
             line_number INTEGER NOT NULL,
             end_line_number INTEGER,
-            parent TEXT
+            parent TEXT,
+            start_byte INTEGER,
+            end_byte INTEGER
         )
     """)
 
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_name ON symbols(name)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_file ON symbols(file_path)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_kind ON symbols(kind)")
+    # Composite indexes matching the MCP server's query shapes:
+    # name [+ kind] lookups, per-file listings ordered by line, and
+    # name + parent disambiguation
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_name_kind ON symbols(name, kind)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_file_line ON symbols(file_path, line_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_name_parent_kind ON symbols(name, parent, kind)")
+    # The BINARY composites above can't serve '= ? COLLATE NOCASE', which
+    # is the server's plain-name search shape
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_name_nocase ON symbols(name COLLATE NOCASE)")
+
+    # Migrate older databases that predate the byte-span columns
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(symbols)")}
+    for col in ("start_byte", "end_byte"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE symbols ADD COLUMN {col} INTEGER")
+
+    # One row per indexed file: list_files reads this instead of running
+    # SELECT DISTINCT over every symbol row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            file_path TEXT PRIMARY KEY,
+            symbol_count INTEGER NOT NULL
+        )
+    """)
+
+    # Trigram FTS over names turns leading-wildcard searches (*Handler*)
+    # into inverted-index probes instead of full scans. Rebuilt from
+    # scratch each full index; triggers keep it in sync for incremental
+    # updates. Skipped silently on SQLite builds without the tokenizer.
+    fts_ok = True
+    conn.execute("DROP TRIGGER IF EXISTS symbols_fts_ai")
+    conn.execute("DROP TRIGGER IF EXISTS symbols_fts_ad")
+    conn.execute("DROP TABLE IF EXISTS symbols_fts")
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE symbols_fts USING fts5(
+                name, content='symbols', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        fts_ok = False
 
     # Create FTS5 virtual table for full-text search (v5+)
     conn.execute("""
@@ -817,14 +1070,23 @@ def write_symbols_to_sqlite(symbols: list[Symbol], db_path: Path) -> None:
     try:
         # Clear existing data and insert new
         conn.execute("DELETE FROM symbols")
+        conn.execute("DELETE FROM files")
         conn.execute("DELETE FROM code_text_fts")  # Clear FTS table too
 
         conn.executemany(
-            """INSERT INTO symbols (name, kind, signature, docstring, file_path, line_number, end_line_number, parent)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            [(s.name, s.kind, s.signature, s.docstring, s.file_path, s.line_number, s.end_line_number, s.parent) for s in symbols]
+            """INSERT INTO symbols (name, kind, signature, docstring, file_path, line_number, end_line_number, parent, start_byte, end_byte)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            # Generator: executemany consumes rows without a second
+            # full-size list of tuples alongside the symbols
+            ((s.name, s.kind, s.signature, s.docstring, s.file_path, s.line_number, s.end_line_number, s.parent, s.start_byte, s.end_byte) for s in symbols)
         )
 
+        conn.execute(
+            "INSERT INTO files SELECT file_path, COUNT(*) FROM symbols GROUP BY file_path")
+
+        if fts_ok:
+            conn.execute("INSERT INTO symbols_fts(rowid, name) SELECT id, name FROM symbols")
+
         # Set metadata to indicate successful indexing completion
         set_metadata(conn, 'status', 'completed')
         set_metadata(conn, 'db_version', str(DB_VERSION))
@@ -833,6 +1095,75 @@ def write_symbols_to_sqlite(symbols: list[Symbol], db_path: Path) -> None:
 
         # Single commit for entire transaction - all or nothing
         conn.commit()
+
+        if fts_ok:
+            # Keep the FTS mirror in sync through the incremental update path
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS symbols_fts_ai AFTER INSERT ON symbols BEGIN
+                    INSERT INTO symbols_fts(rowid, name) VALUES (new.id, new.name);
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS symbols_fts_ad AFTER DELETE ON symbols BEGIN
+                    INSERT INTO symbols_fts(symbols_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                END
+            """)
+
+        # Refresh planner statistics so the new indexes actually get used
+        conn.execute("ANALYZE")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def update_symbols_in_sqlite(changed_symbols: list[Symbol], changed_paths: set[str],
+                             db_path: Path, total_count: int) -> None:
+    """Incrementally replace rows for changed/removed files only.
+
+    Raises sqlite3.OperationalError when the existing schema is too old,
+    in which case the caller falls back to a full rebuild.
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Older schemas need the full-rebuild path (which also migrates)
+        if conn.execute("SELECT 1 FROM pragma_table_info('symbols') WHERE name='start_byte'").fetchone() is None:
+            raise sqlite3.OperationalError("schema predates byte-span columns")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name='files'").fetchone() is None:
+            raise sqlite3.OperationalError("schema predates the files table")
+
+        conn.execute("BEGIN IMMEDIATE")
+        changed = sorted(changed_paths)
+        for i in range(0, len(changed), 500):
+            chunk = changed[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(
+                f"DELETE FROM symbols WHERE file_path IN ({placeholders})", chunk)
+            conn.execute(
+                f"DELETE FROM files WHERE file_path IN ({placeholders})", chunk)
+
+        conn.executemany(
+            """INSERT INTO symbols (name, kind, signature, docstring, file_path, line_number, end_line_number, parent, start_byte, end_byte)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((s.name, s.kind, s.signature, s.docstring, s.file_path, s.line_number, s.end_line_number, s.parent, s.start_byte, s.end_byte) for s in changed_symbols)
+        )
+
+        changed = sorted({s.file_path for s in changed_symbols})
+        for i in range(0, len(changed), 500):
+            chunk = changed[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(
+                f"INSERT INTO files SELECT file_path, COUNT(*) FROM symbols "
+                f"WHERE file_path IN ({placeholders}) GROUP BY file_path", chunk)
+
+        set_metadata(conn, 'status', 'completed')
+        set_metadata(conn, 'db_version', str(DB_VERSION))
+        set_metadata(conn, 'last_indexed', datetime.now().isoformat())
+        set_metadata(conn, 'symbol_count', str(total_count))
+
+        conn.commit()
     except Exception:
         conn.rollback()
         raise
@@ -840,9 +1171,13 @@ def write_symbols_to_sqlite(symbols: list[Symbol], db_path: Path) -> None:
         conn.close()
 
 
-def format_repo_map(symbols: list[Symbol], similar_classes: list, similar_functions: list, doc_coverage: dict, root: Path) -> str:
-    """Format symbols as a hierarchical repo map with analysis."""
-    output = [
+def format_repo_map(symbols: list[Symbol], similar_classes: list, similar_functions: list, doc_coverage: dict, root: Path):
+    """Yield the hierarchical repo map with analysis, one line at a time.
+
+    A generator so callers can stream the map to disk/stdout without ever
+    holding the whole document in memory.
+    """
+    yield from [
         "# Repository Map", "",
         f"Generated from: {root}",
         f"Total symbols: {len(symbols)}", "",
@@ -853,90 +1188,100 @@ def format_repo_map(symbols: list[Symbol], similar_classes: list, similar_functi
         stats = doc_coverage[kind]
         if stats["total"] > 0:
             pct = stats["documented"] / stats["total"] * 100
-            output.append(f"- **{kind.title()}**: {stats['documented']}/{stats['total']} ({pct:.0f}% documented)")
-    output.append("")
+            yield (f"- **{kind.title()}**: {stats['documented']}/{stats['total']} ({pct:.0f}% documented)")
+    yield ("")
 
     if similar_classes:
-        output.extend(["## ⚠️ Potentially Similar Classes", "", "These classes may have overlapping responsibilities:", ""])
+        yield from (["## ⚠️ Potentially Similar Classes", "", "These classes may have overlapping responsibilities:", ""])
         for cls1, cls2, reason in similar_classes:
-            output.extend([
+            yield from ([
                 f"- **{cls1.name}** ({cls1.file_path})",
                 f"  ↔ **{cls2.name}** ({cls2.file_path})",
                 f"  Reason: {reason}",
             ])
             if cls1.docstring:
-                output.append(f"  Doc 1: {cls1.docstring}")
+                yield (f"  Doc 1: {cls1.docstring}")
             if cls2.docstring:
-                output.append(f"  Doc 2: {cls2.docstring}")
-            output.append("")
+                yield (f"  Doc 2: {cls2.docstring}")
+            yield ("")
 
     if similar_functions:
-        output.extend(["## ⚠️ Potentially Similar Functions", "", "These functions may be duplicates:", ""])
+        yield from (["## ⚠️ Potentially Similar Functions", "", "These functions may be duplicates:", ""])
         for fn1, fn2, reason in similar_functions:
-            output.extend([
+            yield from ([
                 f"- **{fn1.name}** ({fn1.file_path}:{fn1.line_number})",
                 f"  ↔ **{fn2.name}** ({fn2.file_path}:{fn2.line_number})",
                 f"  Reason: {reason}",
             ])
             if fn1.docstring:
-                output.append(f"  Doc 1: {fn1.docstring}")
+                yield (f"  Doc 1: {fn1.docstring}")
             if fn2.docstring:
-                output.append(f"  Doc 2: {fn2.docstring}")
-            output.append("")
+                yield (f"  Doc 2: {fn2.docstring}")
+            yield ("")
 
     undoc_classes = doc_coverage["classes"]["undocumented"]
     undoc_functions = doc_coverage["functions"]["undocumented"]
     if undoc_classes or undoc_functions:
-        output.extend(["## 📝 Documentation Opportunities", "", "Adding docstrings helps both humans and AI understand your code:", ""])
+        yield from (["## 📝 Documentation Opportunities", "", "Adding docstrings helps both humans and AI understand your code:", ""])
         if undoc_classes:
-            output.append("**Undocumented classes:**")
+            yield ("**Undocumented classes:**")
             for sym in undoc_classes[:10]:
-                output.append(f"- {sym.name} ({sym.file_path}:{sym.line_number})")
+                yield (f"- {sym.name} ({sym.file_path}:{sym.line_number})")
             if len(undoc_classes) > 10:
-                output.append(f"- ... and {len(undoc_classes) - 10} more")
-            output.append("")
+                yield (f"- ... and {len(undoc_classes) - 10} more")
+            yield ("")
         if undoc_functions:
-            output.append("**Undocumented functions:**")
+            yield ("**Undocumented functions:**")
             for sym in undoc_functions[:10]:
-                output.append(f"- {sym.name} ({sym.file_path}:{sym.line_number})")
+                yield (f"- {sym.name} ({sym.file_path}:{sym.line_number})")
             if len(undoc_functions) > 10:
-                output.append(f"- ... and {len(undoc_functions) - 10} more")
-            output.append("")
+                yield (f"- ... and {len(undoc_functions) - 10} more")
+            yield ("")
 
-    output.extend(["## Code Structure", ""])
+    yield from (["## Code Structure", ""])
 
     by_file: dict[str, list[Symbol]] = defaultdict(list)
     for sym in symbols:
         by_file[sym.file_path].append(sym)
 
     for file_path in sorted(by_file.keys()):
-        file_symbols = by_file[file_path]
-        output.extend([f"### {file_path}", ""])
+        yield from ([f"### {file_path}", ""])
+
+        # One pass partitions the file's symbols; sorting by line once per
+        # bucket replaces the per-class method re-scan (O(K·M) -> O(K+M))
+        classes, funcs = [], []
+        methods_by_parent: dict[str, list[Symbol]] = defaultdict(list)
+        for s in sorted(by_file[file_path], key=lambda s: s.line_number):
+            if s.kind == "class":
+                classes.append(s)
+            elif s.kind == "method":
+                methods_by_parent[s.parent].append(s)
+            else:
+                funcs.append(s)
 
-        for cls in sorted([s for s in file_symbols if s.kind == "class"], key=lambda s: s.line_number):
+        for cls in classes:
             doc_marker = "" if cls.docstring else " ❌"
-            output.append(f"**class {cls.signature}**{doc_marker}")
+            yield (f"**class {cls.signature}**{doc_marker}")
             if cls.docstring:
-                output.append(f"  {cls.docstring}")
-            for method in sorted([s for s in file_symbols if s.kind == "method" and s.parent == cls.name], key=lambda s: s.line_number):
+                yield (f"  {cls.docstring}")
+            for method in methods_by_parent[cls.name]:
                 if method.name.startswith('_'):
                     continue
                 doc_marker = "" if method.docstring else " ❌"
-                output.append(f"  - {method.signature}{doc_marker}")
+                yield (f"  - {method.signature}{doc_marker}")
                 if method.docstring:
-                    output.append(f"      {method.docstring}")
-            output.append("")
+                    yield (f"      {method.docstring}")
+            yield ("")
 
-        for func in sorted([s for s in file_symbols if s.kind == "function"], key=lambda s: s.line_number):
+        for func in funcs:
             if func.name.startswith('_'):
                 continue
             doc_marker = "" if func.docstring else " ❌"
-            output.append(f"**{func.signature}**{doc_marker}")
+            yield (f"**{func.signature}**{doc_marker}")
             if func.docstring:
-                output.append(f"  {func.docstring}")
-            output.append("")
+                yield (f"  {func.docstring}")
+            yield ("")
 
-    return "\n".join(output)
 
 
 EXCLUDE_DIRS = {
@@ -950,10 +1295,13 @@ EXCLUDE_DIRS = {
 def find_files(root: Path, extensions: set[str]) -> list[Path]:
     """Find all files with given extensions, excluding common non-source directories."""
     files = []
-    for ext in extensions:
-        for path in root.rglob(f"*{ext}"):
-            if not any(ex in path.parts for ex in EXCLUDE_DIRS):
-                files.append(path)
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Prune in place: os.walk never descends into excluded trees, unlike
+        # rglob which enumerated node_modules/.venv/... and filtered after
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS]
+        for f in filenames:
+            if os.path.splitext(f)[1] in extensions:
+                files.append(Path(dirpath) / f)
     return sorted(files)
 
 
@@ -1064,37 +1412,21 @@ def main():
         # First pass: check cache and categorize files
         all_symbols = []
         all_rel_paths = set()
+        parsed_rel_paths = set()  # files whose DB rows need replacing
         files_to_parse = []  # (file_path_str, root_str, language)
 
-        # Check Python files
-        for file_path in python_files:
-            rel_path = str(file_path.relative_to(root))
-            all_rel_paths.add(rel_path)
-            symbols, was_cached = cache.get_symbols(file_path, rel_path)
-            if was_cached:
-                all_symbols.extend(symbols)
-            else:
-                files_to_parse.append((str(file_path), str(root), "python"))
-
-        # Check C++ files
-        for file_path in cpp_files:
-            rel_path = str(file_path.relative_to(root))
-            all_rel_paths.add(rel_path)
-            symbols, was_cached = cache.get_symbols(file_path, rel_path)
-            if was_cached:
-                all_symbols.extend(symbols)
-            else:
-                files_to_parse.append((str(file_path), str(root), "cpp"))
-
-        # Check Rust files
-        for file_path in rust_files:
-            rel_path = str(file_path.relative_to(root))
-            all_rel_paths.add(rel_path)
-            symbols, was_cached = cache.get_symbols(file_path, rel_path)
-            if was_cached:
-                all_symbols.extend(symbols)
-            else:
-                files_to_parse.append((str(file_path), str(root), "rust"))
+        # One loop over all languages; only the parse tag differs
+        for file_list, language in ((python_files, "python"),
+                                    (cpp_files, "cpp"),
+                                    (rust_files, "rust")):
+            for file_path in file_list:
+                rel_path = str(file_path.relative_to(root))
+                all_rel_paths.add(rel_path)
+                symbols, was_cached = cache.get_symbols(file_path, rel_path)
+                if was_cached:
+                    all_symbols.extend(symbols)
+                else:
+                    files_to_parse.append((str(file_path), str(root), language))
 
         cached_count = total_files - len(files_to_parse)
         parsed_count = len(files_to_parse)
@@ -1130,25 +1462,27 @@ def main():
             update_interval = max(1, len(files_to_parse) // 20)  # Update ~20 times = every 5%
 
             if num_workers > 1 and len(files_to_parse) > 10:
-                # Parallel parsing with threads (shares memory, safe for large codebases)
-                print(f"Parsing {len(files_to_parse)} files with {num_workers} threads...")
-                with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                    futures = {executor.submit(parse_file_worker, args): args for args in files_to_parse}
+                # Parallel parsing with processes (AST/tree-sitter parsing is
+                # CPU-bound, so threads would serialize on the GIL)
+                print(f"Parsing {len(files_to_parse)} files with {num_workers} processes...")
+                with ProcessPoolExecutor(max_workers=num_workers) as executor:
                     completed = 0
-                    for future in as_completed(futures):
-                        try:
-                            rel_path, mtime, content_hash, symbol_dicts, lang = future.result()
+                    try:
+                        # chunksize amortizes IPC overhead across many small files
+                        for result in executor.map(parse_file_worker, files_to_parse, chunksize=16):
+                            rel_path, mtime, content_hash, symbol_dicts, lang = result
                             symbols = [Symbol.from_dict(d) for d in symbol_dicts]
                             all_symbols.extend(symbols)
                             if mtime > 0:  # Valid result
                                 cache.update(rel_path, mtime, content_hash, symbols)
+                                parsed_rel_paths.add(rel_path)
                             completed += 1
                             if completed % update_interval == 0 or completed == len(files_to_parse):
                                 cache.save_if_needed()
                                 update_progress("parsing", completed, len(files_to_parse), len(all_symbols))
                                 print(f"  Parsed {completed}/{len(files_to_parse)} files...")
-                        except Exception as e:
-                            print(f"  Error parsing file: {e}")
+                    except Exception as e:
+                        print(f"  Error parsing file: {e}")
             else:
                 # Sequential parsing for small number of files
                 completed = 0
@@ -1158,33 +1492,85 @@ def main():
                     all_symbols.extend(symbols)
                     if mtime > 0:
                         cache.update(rel_path, mtime, content_hash, symbols)
+                        parsed_rel_paths.add(rel_path)
                     cache.save_if_needed()
                     completed += 1
                     if completed % update_interval == 0 or completed == len(files_to_parse):
                         update_progress("parsing", completed, len(files_to_parse), len(all_symbols))
 
         # Remove deleted files from cache
-        cache.remove_stale(all_rel_paths)
+        removed_paths = cache.remove_stale(all_rel_paths)
 
         # Save final cache state (found_file_count already set earlier)
         cache.save()
 
-        # Write to SQLite database for MCP server queries
-        write_symbols_to_sqlite(all_symbols, db_path)
+        # Write to SQLite database for MCP server queries. When only a few
+        # files changed, replace just their rows instead of rebuilding the
+        # whole table (full rebuild stays as the fallback/migration path).
+        changed_paths = parsed_rel_paths | set(removed_paths)
+
+        def write_db() -> None:
+            wrote_incremental = False
+            if db_path.exists() and len(changed_paths) < total_files:
+                try:
+                    changed_symbols = [s for s in all_symbols if s.file_path in parsed_rel_paths]
+                    update_symbols_in_sqlite(changed_symbols, changed_paths, db_path, len(all_symbols))
+                    wrote_incremental = True
+                except sqlite3.Error:
+                    pass
+            if not wrote_incremental:
+                write_symbols_to_sqlite(all_symbols, db_path)
+
+        # Overlap the (I/O-heavy) database write with the (CPU-heavy)
+        # similarity analysis and markdown rendering; queries become
+        # serveable as soon as the write lands, not after the report
+        db_errors: list[Exception] = []
+
+        def write_db_guarded() -> None:
+            try:
+                write_db()
+            except Exception as e:  # re-raised on the main thread after join
+                db_errors.append(e)
+
+        db_thread = threading.Thread(target=write_db_guarded)
+        db_thread.start()
 
-        similar_classes = find_similar_classes(all_symbols)
-        similar_functions = find_similar_functions(all_symbols)
-        doc_coverage = analyze_documentation_coverage(all_symbols)
+        # The markdown report (and the O(n²) similarity scan feeding it) is
+        # only for human/command consumption; the MCP server sets this when
+        # spawning us since its tools read the database alone
+        skip_markdown = os.environ.get("REPO_MAP_SKIP_MARKDOWN") == "1"
 
-        repo_map = format_repo_map(all_symbols, similar_classes, similar_functions, doc_coverage, root)
+        similar_classes = [] if skip_markdown else find_similar_classes(all_symbols)
+        similar_functions = [] if skip_markdown else find_similar_functions(all_symbols)
+        doc_coverage = analyze_documentation_coverage(all_symbols)
 
         claude_dir.mkdir(exist_ok=True)
 
-        # Write to .in-progress first, then rename atomically
-        in_progress_path = claude_dir / "repo-map.md.in-progress"
-        final_path = claude_dir / "repo-map.md"
-        in_progress_path.write_text(repo_map)
-        in_progress_path.rename(final_path)
+        if not skip_markdown:
+            # Write to .in-progress first, then rename atomically. The map is
+            # streamed line-by-line to the file and stdout so the full document
+            # never has to be materialized in memory.
+            in_progress_path = claude_dir / "repo-map.md.in-progress"
+            final_path = claude_dir / "repo-map.md"
+            # A consumer may close stdout early (e.g. `map.py . | head`);
+            # the file write must survive that, so EPIPE only stops the
+            # echo, never the report
+            stdout_open = True
+            with open(in_progress_path, "w", buffering=65536) as f:
+                for line in format_repo_map(all_symbols, similar_classes, similar_functions, doc_coverage, root):
+                    f.write(line)
+                    f.write("\n")
+                    if stdout_open:
+                        try:
+                            sys.stdout.write(line)
+                            sys.stdout.write("\n")
+                        except BrokenPipeError:
+                            stdout_open = False
+            in_progress_path.rename(final_path)
+
+        db_thread.join()
+        if db_errors:
+            raise db_errors[0]
 
         # Write final progress status
         progress_path = claude_dir / "repo-map-progress.json"
@@ -1209,31 +1595,36 @@ def main():
             except (ValueError, OSError):
                 pass
 
-        print(repo_map)
-        print("\n---")
-        print(f"Repo map saved to: {claude_dir / 'repo-map.md'}")
-
-        # Show file counts by language
-        file_counts = []
-        if python_files:
-            file_counts.append(f"{len(python_files)} Python")
-        if cpp_files:
-            file_counts.append(f"{len(cpp_files)} C/C++/ObjC++/Metal")
-        if rust_files:
-            file_counts.append(f"{len(rust_files)} Rust")
-        print(f"Files: {total_files} ({', '.join(file_counts)})")
-        print(f"Cache: {cached_count} cached, {parsed_count} parsed")
-
-        print(f"Symbols found: {len(all_symbols)}")
-        if similar_classes:
-            print(f"Similar classes found: {len(similar_classes)}")
-        if similar_functions:
-            print(f"Similar functions found: {len(similar_functions)}")
-
-        for kind in ["classes", "functions", "methods"]:
-            stats = doc_coverage[kind]
-            if stats["total"] > 0:
-                print(f"{kind.title()} documented: {stats['documented']}/{stats['total']} ({stats['documented']/stats['total']*100:.0f}%)")
+        # The index and report are already on disk; if the consumer closed
+        # stdout (| head), losing the summary must not mark the run failed
+        try:
+            print("\n---")
+            if not skip_markdown:
+                print(f"Repo map saved to: {claude_dir / 'repo-map.md'}")
+
+            # Show file counts by language
+            file_counts = []
+            if python_files:
+                file_counts.append(f"{len(python_files)} Python")
+            if cpp_files:
+                file_counts.append(f"{len(cpp_files)} C/C++/ObjC++/Metal")
+            if rust_files:
+                file_counts.append(f"{len(rust_files)} Rust")
+            print(f"Files: {total_files} ({', '.join(file_counts)})")
+            print(f"Cache: {cached_count} cached, {parsed_count} parsed")
+
+            print(f"Symbols found: {len(all_symbols)}")
+            if similar_classes:
+                print(f"Similar classes found: {len(similar_classes)}")
+            if similar_functions:
+                print(f"Similar functions found: {len(similar_functions)}")
+
+            for kind in ["classes", "functions", "methods"]:
+                stats = doc_coverage[kind]
+                if stats["total"] > 0:
+                    print(f"{kind.title()} documented: {stats['documented']}/{stats['total']} ({stats['documented']/stats['total']*100:.0f}%)")
+        except BrokenPipeError:
+            pass
 
     except Exception as e:
         # Set status to 'failed' on error
@@ -17,19 +17,25 @@ Uses the narrative.md to create a user-focused README with:
 Usage:
     uv run scripts/readme.py [project_root]
     uv run scripts/readme.py --update  # Update existing README
+    uv run scripts/story.py | uv run scripts/readme.py --stdin  # Pipe narrative
 """
 
+import functools
 import sys
 from pathlib import Path
 import anthropic
 import argparse
 
 
+@functools.cache
+def get_client() -> anthropic.Anthropic:
+    """Construct the Anthropic client once per process."""
+    return anthropic.Anthropic()
+
+
 def generate_readme(narrative: str, existing_readme: str | None = None) -> str:
     """Use Claude to generate a README from the narrative."""
 
-    client = anthropic.Anthropic()
-
     if existing_readme:
         context = f"""You are updating a README based on the project narrative.
 
@@ -123,13 +129,21 @@ RULES:
 Output ONLY the markdown README, nothing else.
 """
 
-    response = client.messages.create(
+    # Stream so output appears as it generates instead of after the full
+    # 4000-token completion
+    chunks = []
+    with get_client().messages.stream(
         model="claude-sonnet-4-20250514",
         max_tokens=4000,
         messages=[{"role": "user", "content": prompt}]
-    )
+    ) as stream:
+        for text in stream.text_stream:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            chunks.append(text)
+    sys.stdout.write("\n")
 
-    result = response.content[0].text
+    result = "".join(chunks)
 
     # Strip markdown code fences if Claude wrapped the output
     if result.startswith("```markdown"):
@@ -147,19 +161,27 @@ def main():
     parser.add_argument("project", nargs="?", default=".", help="Project root directory")
     parser.add_argument("--update", "-u", action="store_true", help="Update existing README")
     parser.add_argument("--dry-run", "-n", action="store_true", help="Print without saving")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Read narrative from stdin instead of .claude/narrative.md")
     args = parser.parse_args()
 
     project_root = Path(args.project).resolve()
     narrative_file = project_root / ".claude" / "narrative.md"
     readme_file = project_root / "README.md"
 
-    if not narrative_file.exists():
+    if args.stdin:
+        # Narrative was just generated upstream; skip the disk round-trip
+        narrative = sys.stdin.read()
+        if not narrative.strip():
+            print("Error: No narrative received on stdin", file=sys.stderr)
+            sys.exit(1)
+    elif narrative_file.exists():
+        narrative = narrative_file.read_text()
+    else:
         print(f"Error: No narrative found at {narrative_file}", file=sys.stderr)
         print("Run story.py first.", file=sys.stderr)
         sys.exit(1)
 
-    narrative = narrative_file.read_text()
-
     existing_readme = None
     if args.update and readme_file.exists():
         existing_readme = readme_file.read_text()
@@ -167,12 +189,13 @@ def main():
     else:
         print("Generating new README...", file=sys.stderr)
 
-    readme = generate_readme(narrative, existing_readme)
-
     if args.dry_run:
         print("\n--- GENERATED README (dry run) ---\n")
-        print(readme)
-    else:
+
+    # generate_readme streams the text to stdout as it generates
+    readme = generate_readme(narrative, existing_readme)
+
+    if not args.dry_run:
         if readme_file.exists():
             backup = project_root / "README.md.bak"
             backup.write_text(readme_file.read_text())
@@ -180,7 +203,6 @@ def main():
 
         readme_file.write_text(readme)
         print(f"README saved to {readme_file}", file=sys.stderr)
-        print(readme)
 
 
 if __name__ == "__main__":
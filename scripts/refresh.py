@@ -21,28 +21,17 @@ Usage:
     uv run scripts/update-narrative.py --file session-notes.txt
 """
 
+import hashlib
+import re
 import sys
 from pathlib import Path
 import anthropic
 import argparse
 
 
-def update_narrative(current_narrative: str, session_summary: str) -> str:
-    """Use Claude to update the narrative based on session activity."""
-
-    client = anthropic.Anthropic()
-
-    prompt = f"""You are updating a project narrative document based on what happened in a recent session.
-
-CURRENT NARRATIVE:
-```markdown
-{current_narrative}
-```
-
-SESSION SUMMARY (what we worked on):
-```
-{session_summary}
-```
+# Static revision instructions; kept at module scope so the API call can
+# mark them as a cacheable system block
+UPDATE_RULES = """You are updating a project narrative document based on what happened in a recent session.
 
 Your task: UPDATE the narrative to incorporate what we learned/did this session.
 
@@ -62,25 +51,43 @@ Specific guidance:
 
 If the session didn't change much about our understanding, it's OK for the narrative to be mostly the same.
 The goal is a LIVING DOCUMENT that reflects our current understanding, not a log of everything that happened.
+"""
+
+
+def update_narrative(current_narrative: str, session_summary: str) -> str:
+    """Use Claude to update the narrative based on session activity."""
+
+    client = anthropic.Anthropic()
+
+    prompt = f"""SESSION SUMMARY (what we worked on):
+```
+{session_summary}
+```
 
 Output ONLY the updated markdown document, nothing else.
 """
 
+    # The rules never change and the narrative changes far less often than
+    # the session summary; caching both blocks makes repeat updates within
+    # the cache TTL much cheaper and faster to first token
     response = client.messages.create(
         model="claude-sonnet-4-20250514",
         max_tokens=4000,
+        system=[
+            {"type": "text", "text": UPDATE_RULES,
+             "cache_control": {"type": "ephemeral"}},
+            {"type": "text",
+             "text": f"CURRENT NARRATIVE:\n```markdown\n{current_narrative}\n```",
+             "cache_control": {"type": "ephemeral"}},
+        ],
         messages=[{"role": "user", "content": prompt}]
     )
 
     result = response.content[0].text
 
-    # Strip markdown code fences if Claude wrapped the output
-    if result.startswith("```markdown"):
-        result = result[len("```markdown"):].lstrip("\n")
-    if result.startswith("```"):
-        result = result[3:].lstrip("\n")
-    if result.endswith("```"):
-        result = result[:-3].rstrip("\n")
+    # Strip markdown code fences if Claude wrapped the output (one pass,
+    # handles both ```markdown and bare ``` plus trailing whitespace)
+    result = re.sub(r"^\s*```(?:markdown)?\s*\n?|\n?```\s*$", "", result)
 
     return result
 
@@ -120,6 +127,14 @@ def main():
         print("Error: Session summary is empty.", file=sys.stderr)
         sys.exit(1)
 
+    # A model round-trip costs seconds and real money; skip it when the
+    # summary is identical to the last one we applied
+    summary_hash = hashlib.blake2b(session_summary.encode()).hexdigest()[:16]
+    hash_file = project_root / ".claude" / ".narrative.last-summary-hash"
+    if hash_file.exists() and hash_file.read_text().strip() == summary_hash:
+        print("Session summary unchanged since last update; skipping.", file=sys.stderr)
+        return
+
     print(f"Updating narrative based on session summary...", file=sys.stderr)
     print(f"Session: {session_summary[:100]}{'...' if len(session_summary) > 100 else ''}", file=sys.stderr)
 
@@ -136,6 +151,7 @@ def main():
 
         # Save updated narrative
         narrative_file.write_text(updated_narrative)
+        hash_file.write_text(summary_hash)
         print(f"Narrative updated at {narrative_file}", file=sys.stderr)
         print(updated_narrative)
 
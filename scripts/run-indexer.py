@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Apply resource limits, then exec the repo-map indexer.
+
+The MCP server used to install these limits via Popen(preexec_fn=...),
+which forces CPython onto the slow fork+exec path. Setting them in the
+child instead lets the server spawn with posix_spawn.
+
+Usage:
+    python3 scripts/run-indexer.py [map.py args...]
+"""
+
+import os
+import resource
+import sys
+from pathlib import Path
+
+
+def apply_limits():
+    """Set resource limits for the indexing process (Unix only)."""
+    try:
+        # Limit memory to 4GB (generous, catches runaway allocations)
+        # RLIMIT_AS = virtual memory address space
+        memory_limit = 4 * 1024 * 1024 * 1024  # 4GB in bytes
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except (ValueError, OSError, AttributeError):
+        # May fail on some systems or if resource module unavailable
+        pass
+
+    try:
+        # Limit CPU time to 20 minutes (watchdog catches at 10 min wall-clock time)
+        cpu_time_limit = 1200  # 20 minutes in seconds
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
+    except (ValueError, OSError, AttributeError):
+        pass
+
+
+def main():
+    apply_limits()
+    map_script = str(Path(__file__).resolve().parent / "map.py")
+    os.execvp("uv", ["uv", "run", map_script, *sys.argv[1:]])
+
+
+if __name__ == "__main__":
+    main()
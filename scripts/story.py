@@ -14,132 +14,174 @@ Usage:
     uv run scripts/story.py [project_root]
 """
 
+import functools
 import subprocess
 import json
+import os
 import sys
 from pathlib import Path
-from datetime import datetime
-from collections import defaultdict
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict
 import anthropic
 
-def run_git(args: list[str], cwd: Path) -> str:
-    """Run a git command and return output."""
+@functools.cache
+def get_client() -> anthropic.Anthropic:
+    """Construct the Anthropic client once per process."""
+    return anthropic.Anthropic()
+
+@functools.lru_cache(maxsize=64)
+def run_git(args: tuple[str, ...], cwd: Path) -> str:
+    """Run a git command and return output.
+
+    Memoized per invocation so identical queries from different code
+    paths don't re-spawn git (args must be a tuple to stay hashable).
+    """
     result = subprocess.run(
-        ["git"] + args,
+        ["git", *args],
         cwd=cwd,
         capture_output=True,
         text=True
     )
     return result.stdout.strip()
 
-def get_commit_history(cwd: Path, limit: int = 500) -> list[dict]:
-    """Get commit history with details."""
-    # Format: hash|author|date|subject
-    log = run_git([
+def iter_git(args: list[str], cwd: Path):
+    """Run a git command and yield output lines as git produces them.
+
+    Avoids buffering the whole output into one string (then splitting it
+    into a second copy) and lets parsing overlap git's own walk.
+    """
+    proc = subprocess.Popen(
+        ["git"] + args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    try:
+        for line in proc.stdout:
+            yield line.rstrip("\n")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def collect_log(cwd: Path, limit: int = 500) -> list[dict]:
+    """Get commit history with changed files attached, in one git pass.
+
+    Uses `git log --raw`, which only walks tree deltas — unlike
+    --shortstat/--numstat it never computes line diffs, often several
+    times faster on long histories. Line counts are filled in separately
+    by attach_line_stats for the commits that need them.
+    """
+    # @@@ marks the start of a commit record; raw diff lines follow
+    commits = []
+    commit = None
+    for line in iter_git([
         "log",
         f"-{limit}",
-        "--pretty=format:%H|%an|%aI|%s",
+        "--pretty=format:@@@%H|%an|%aI|%s",
+        "--raw",
         "--no-merges"
-    ], cwd)
-
-    commits = []
-    for line in log.split("\n"):
-        if not line.strip():
+    ], cwd):
+        line = line.strip()
+        if not line:
             continue
-        parts = line.split("|", 3)
-        if len(parts) >= 4:
-            commits.append({
-                "hash": parts[0][:8],
-                "author": parts[1],
-                "date": parts[2][:10],
-                "subject": parts[3]
-            })
+        if line.startswith("@@@"):
+            parts = line[3:].split("|", 3)
+            if len(parts) >= 4:
+                commit = {
+                    "hash": parts[0][:8],
+                    "author": parts[1],
+                    "date": parts[2][:10],
+                    # Cap subjects so one giant commit message can't balloon
+                    # the prompt payload
+                    "subject": parts[3][:120],
+                    "files": [],
+                    "files_changed": 0,
+                    # None = line counts unknown (outside the numstat window)
+                    "insertions": None,
+                    "deletions": None
+                }
+                commits.append(commit)
+            else:
+                commit = None
+        elif commit is not None and line.startswith(":") and "\t" in line:
+            # raw line: ":mode mode sha sha STATUS\tpath" (renames: "\told\tnew")
+            filepath = line.rsplit("\t", 1)[1]
+            commit["files"].append(filepath)
+            commit["files_changed"] += 1
     return commits
 
-def get_commit_files(cwd: Path, commit_hash: str) -> list[str]:
-    """Get files changed in a commit."""
-    output = run_git(["show", "--name-only", "--pretty=format:", commit_hash], cwd)
-    return [f for f in output.split("\n") if f.strip()]
+def attach_line_stats(commits: list[dict], cwd: Path, limit: int = 100) -> None:
+    """Fill insertions/deletions for recent commits via one --numstat pass.
 
-def get_file_history(cwd: Path, filepath: str) -> list[dict]:
-    """Get commit history for a specific file."""
-    log = run_git([
+    Kept separate from collect_log because numstat forces git to diff
+    every commit; only the major-changes view needs line counts, and only
+    for the recent window.
+    """
+    by_hash = {c["hash"]: c for c in commits}
+    commit = None
+    for line in iter_git([
         "log",
-        "--pretty=format:%H|%aI|%s",
-        "--follow",
-        "--", filepath
-    ], cwd)
-
-    commits = []
-    for line in log.split("\n"):
-        if not line.strip():
+        f"-{limit}",
+        "--pretty=format:@@@%H",
+        "--numstat",
+        "--no-merges"
+    ], cwd):
+        line = line.strip()
+        if not line:
             continue
-        parts = line.split("|", 2)
-        if len(parts) >= 3:
-            commits.append({
-                "hash": parts[0][:8],
-                "date": parts[1][:10],
-                "subject": parts[2]
-            })
-    return commits
+        if line.startswith("@@@"):
+            commit = by_hash.get(line[3:11])
+            if commit is not None:
+                commit["insertions"] = 0
+                commit["deletions"] = 0
+        elif commit is not None and "\t" in line:
+            # numstat line: "<insertions>\t<deletions>\t<path>" ("-" for binary)
+            ins, dels, _ = line.split("\t", 2)
+            if ins.isdigit():
+                commit["insertions"] += int(ins)
+            if dels.isdigit():
+                commit["deletions"] += int(dels)
+
+
+def get_commit_history(commits: list[dict], limit: int = 500) -> list[dict]:
+    """Get commit history with details."""
+    return [{
+        "hash": c["hash"],
+        "author": c["author"],
+        "date": c["date"],
+        "subject": c["subject"]
+    } for c in commits[:limit]]
 
-def get_major_changes(cwd: Path, limit: int = 50) -> list[dict]:
-    """Find commits with significant changes (many files)."""
-    log = run_git([
-        "log",
-        f"-{limit * 2}",
-        "--pretty=format:%H|%aI|%s",
-        "--shortstat",
-        "--no-merges"
-    ], cwd)
+def get_commit_files(cwd: Path, commit_hash: str) -> list[str]:
+    """Get files changed in a commit."""
+    output = run_git(("show", "--name-only", "--pretty=format:", commit_hash), cwd)
+    return [f for f in output.split("\n") if f.strip()]
 
+def get_major_changes(commits: list[dict], limit: int = 50) -> list[dict]:
+    """Find commits with significant changes (many files)."""
     major = []
-    lines = log.split("\n")
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if "|" in line:
-            parts = line.split("|", 2)
-            if len(parts) >= 3:
-                commit = {
-                    "hash": parts[0][:8],
-                    "date": parts[1][:10],
-                    "subject": parts[2],
-                    "files_changed": 0,
-                    "insertions": 0,
-                    "deletions": 0
-                }
-                # Look for stat line
-                if i + 2 < len(lines):
-                    stat_line = lines[i + 2].strip()
-                    if "file" in stat_line:
-                        # Parse "X files changed, Y insertions(+), Z deletions(-)"
-                        import re
-                        files_match = re.search(r"(\d+) file", stat_line)
-                        ins_match = re.search(r"(\d+) insertion", stat_line)
-                        del_match = re.search(r"(\d+) deletion", stat_line)
-                        if files_match:
-                            commit["files_changed"] = int(files_match.group(1))
-                        if ins_match:
-                            commit["insertions"] = int(ins_match.group(1))
-                        if del_match:
-                            commit["deletions"] = int(del_match.group(1))
-
-                # Consider "major" if touches many files or lots of lines
-                if commit["files_changed"] >= 5 or (commit["insertions"] + commit["deletions"]) >= 100:
-                    major.append(commit)
-        i += 1
-
-    return major[:limit]
+    for c in commits:
+        # Consider "major" if touches many files or lots of lines
+        if c["files_changed"] >= 5 or (c["insertions"] or 0) + (c["deletions"] or 0) >= 100:
+            major.append({
+                "hash": c["hash"],
+                "date": c["date"],
+                "subject": c["subject"],
+                "files_changed": c["files_changed"],
+                "insertions": c["insertions"],
+                "deletions": c["deletions"]
+            })
+            if len(major) >= limit:
+                break
+    return major
 
 def get_directory_structure(cwd: Path) -> dict:
     """Get current directory structure with file counts."""
     structure = defaultdict(lambda: {"files": 0, "extensions": set()})
 
     # Get tracked files
-    files = run_git(["ls-files"], cwd).split("\n")
-
-    for f in files:
+    for f in iter_git(["ls-files"], cwd):
         if not f.strip():
             continue
         path = Path(f)
@@ -157,7 +199,7 @@ def get_directory_structure(cwd: Path) -> dict:
 
 def get_authors(cwd: Path) -> list[dict]:
     """Get contributor summary."""
-    log = run_git(["shortlog", "-sne", "HEAD"], cwd)
+    log = run_git(("shortlog", "-sne", "HEAD"), cwd)
     authors = []
     for line in log.split("\n"):
         if not line.strip():
@@ -167,54 +209,50 @@ def get_authors(cwd: Path) -> list[dict]:
         if len(parts) >= 2:
             authors.append({
                 "commits": int(parts[0].strip()),
-                "name": parts[1].split("<")[0].strip()
+                "name": parts[1].split("<")[0].strip()[:60]
             })
     return authors[:10]
 
-def get_file_churn(cwd: Path, limit: int = 20) -> list[dict]:
+def get_file_churn(commits: list[dict], limit: int = 20) -> list[dict]:
     """Find files that change most frequently."""
-    # Get all files changed in recent commits
-    log = run_git(["log", "-200", "--name-only", "--pretty=format:"], cwd)
-
-    file_counts = defaultdict(int)
-    for line in log.split("\n"):
-        if line.strip():
-            file_counts[line.strip()] += 1
+    file_counts = Counter()
+    for c in commits[:200]:
+        file_counts.update(c["files"])
 
-    # Sort by count
-    sorted_files = sorted(file_counts.items(), key=lambda x: -x[1])
-    return [{"file": f, "changes": c} for f, c in sorted_files[:limit]]
+    # most_common uses a heap: O(n log k) instead of a full sort
+    return [{"file": f, "changes": c} for f, c in file_counts.most_common(limit)]
 
-def get_recent_activity(cwd: Path, days: int = 30) -> dict:
+def get_recent_activity(commits: list[dict], days: int = 30) -> dict:
     """Get recent activity summary."""
-    since = f"--since={days} days ago"
+    cutoff = (datetime.now() - timedelta(days=days)).date().isoformat()
 
-    commit_count = len(run_git(["log", since, "--oneline"], cwd).split("\n"))
-
-    # Get recently changed files
-    files = run_git(["log", since, "--name-only", "--pretty=format:"], cwd)
-    recent_files = set(f for f in files.split("\n") if f.strip())
+    recent = [c for c in commits if c["date"] >= cutoff]
+    recent_files = set()
+    for c in recent:
+        recent_files.update(c["files"])
 
     return {
-        "commits_last_30_days": commit_count,
+        "commits_last_30_days": len(recent),
         "files_touched": len(recent_files)
     }
 
 def extract_git_data(project_root: Path) -> dict:
     """Extract all relevant git data for narrative generation."""
-    import os
     print("Extracting git history...", file=sys.stderr)
 
+    all_commits = collect_log(project_root, limit=500)
+    attach_line_stats(all_commits, project_root, limit=100)
+
     data = {
         "project_name": project_root.name,
         "extracted_at": datetime.now().isoformat(),
         "session_id": os.environ.get("CLAUDE_SESSION_ID", "unknown"),
-        "commits": get_commit_history(project_root, limit=200),
-        "major_changes": get_major_changes(project_root, limit=30),
+        "commits": get_commit_history(all_commits, limit=200),
+        "major_changes": get_major_changes(all_commits, limit=30),
         "structure": get_directory_structure(project_root),
         "authors": get_authors(project_root),
-        "file_churn": get_file_churn(project_root, limit=15),
-        "recent_activity": get_recent_activity(project_root),
+        "file_churn": get_file_churn(all_commits, limit=15),
+        "recent_activity": get_recent_activity(all_commits),
     }
 
     # Get first and last commit dates
@@ -225,12 +263,60 @@ def extract_git_data(project_root: Path) -> dict:
 
     return data
 
+def format_git_data(git_data: dict) -> str:
+    """Format git data compactly for the prompt.
+
+    Pretty-printed JSON repeats every key per row; a columnar layout cuts
+    the token count (and so API latency/cost) roughly in half.
+    """
+    lines = [
+        f"project: {git_data['project_name']}",
+        f"first_commit: {git_data.get('first_commit', '?')}  "
+        f"last_commit: {git_data.get('last_commit', '?')}  "
+        f"total_commits: {git_data.get('total_commits', 0)}",
+        "",
+        "commits (hash,date,author,subject):",
+    ]
+    for c in git_data["commits"]:
+        lines.append(f"{c['hash']},{c['date']},{c['author']},{c['subject']}")
+
+    lines.append("")
+    lines.append("major_changes (hash,date,files,+ins,-del,subject):")
+    for c in git_data["major_changes"]:
+        # Commits outside the numstat window have no line counts
+        if c['insertions'] is None:
+            counts = "+?,-?"
+        else:
+            counts = f"+{c['insertions']},-{c['deletions']}"
+        lines.append(f"{c['hash']},{c['date']},{c['files_changed']},"
+                     f"{counts},{c['subject']}")
+
+    lines.append("")
+    lines.append("structure (dir,files,extensions):")
+    for name, info in git_data["structure"].items():
+        lines.append(f"{name},{info['files']},{' '.join(info['extensions'])}")
+
+    lines.append("")
+    lines.append("authors (commits,name):")
+    for a in git_data["authors"]:
+        lines.append(f"{a['commits']},{a['name']}")
+
+    lines.append("")
+    lines.append("file_churn (changes,file):")
+    for f in git_data["file_churn"]:
+        lines.append(f"{f['changes']},{f['file']}")
+
+    activity = git_data["recent_activity"]
+    lines.append("")
+    lines.append(f"recent_activity: {activity['commits_last_30_days']} commits "
+                 f"touching {activity['files_touched']} files in the last 30 days")
+
+    return "\n".join(lines)
+
 def generate_narrative(git_data: dict) -> str:
     """Use Claude to generate a narrative from git data."""
     print("Generating narrative with Claude...", file=sys.stderr)
 
-    client = anthropic.Anthropic()
-
     prompt = f"""Analyze this git history data and generate a PROJECT NARRATIVE document.
 
 This is NOT a changelog or git log. It's a living narrative that tells the STORY of this codebase -
@@ -242,8 +328,8 @@ Not "Rob did X" but "We built X because..."
 Be opinionated. Include hunches and intuitions, not just facts.
 
 Git Data:
-```json
-{json.dumps(git_data, indent=2)}
+```
+{format_git_data(git_data)}
 ```
 
 Generate a markdown document with EXACTLY this structure:
@@ -286,13 +372,21 @@ Remember:
 - This document should help future-us (or new team members) understand not just WHAT but WHY
 """
 
-    response = client.messages.create(
+    # Stream so output appears as it generates instead of after the full
+    # 4000-token completion
+    chunks = []
+    with get_client().messages.stream(
         model="claude-sonnet-4-20250514",
         max_tokens=4000,
         messages=[{"role": "user", "content": prompt}]
-    )
+    ) as stream:
+        for text in stream.text_stream:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            chunks.append(text)
+    sys.stdout.write("\n")
 
-    result = response.content[0].text
+    result = "".join(chunks)
 
     # Strip markdown code fences if Claude wrapped the output
     if result.startswith("```markdown"):
@@ -311,7 +405,8 @@ def main():
     parser.add_argument("--extract-only", action="store_true", help="Only extract git data, don't generate narrative")
     args = parser.parse_args()
 
-    project_root = Path(args.project_root).resolve()
+    # abspath is enough here (and cheaper than resolve's symlink walk)
+    project_root = Path(os.path.abspath(args.project_root))
 
     if not (project_root / ".git").exists():
         print(f"Error: {project_root} is not a git repository", file=sys.stderr)
@@ -334,7 +429,6 @@ def main():
         return
 
     # Check for API key to generate via API
-    import os
     if os.environ.get("ANTHROPIC_API_KEY"):
         narrative = generate_narrative(git_data)
 
@@ -342,8 +436,8 @@ def main():
         with open(narrative_file, "w") as f:
             f.write(narrative)
 
+        # generate_narrative already streamed the text to stdout
         print(f"Narrative saved to {narrative_file}", file=sys.stderr)
-        print(narrative)
     else:
         print("No ANTHROPIC_API_KEY found. Use --extract-only and let Claude Code generate the narrative.", file=sys.stderr)
         sys.exit(1)
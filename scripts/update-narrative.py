@@ -18,15 +18,24 @@ Usage:
     echo "summary" | uv run scripts/update-narrative.py --stdin
 """
 
+import functools
+import hashlib
+import re
 import subprocess
 import sys
 import os
 import shutil
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import anthropic
 
 
+@functools.cache
+def get_client() -> anthropic.Anthropic:
+    """Construct the Anthropic client once per process."""
+    return anthropic.Anthropic()
+
+
 def backup_narrative(narrative_file: Path) -> Path:
     """Create a backup of the current narrative."""
     backup_file = narrative_file.with_suffix(".md.bak")
@@ -46,44 +55,49 @@ def get_git_history_since_narrative(project_root: Path, narrative_file: Path, ma
         )
         if result.returncode != 0 or not result.stdout.strip():
             # Narrative not in git, get last 2 weeks of commits
-            since_date = (datetime.now() - __import__('datetime').timedelta(days=14)).isoformat()
+            since_date = (datetime.now() - timedelta(days=14)).isoformat()
             last_commit = None
         else:
             parts = result.stdout.strip().split(" ", 1)
             last_commit = parts[0]
             since_date = parts[1] if len(parts) > 1 else None
 
-        # Get commits since that point
-        cmd = ["git", "log", f"--max-count={max_commits}", "--format=%h %s (%an, %ar)"]
+        # One log walk yields both the commit lines and the files they touched,
+        # instead of a second fork for git diff --name-only
+        cmd = ["git", "log", f"--max-count={max_commits}", "--name-only",
+               "--format=@@@%h %s (%an, %ar)"]
         if last_commit:
             cmd.append(f"{last_commit}..HEAD")
         elif since_date:
-            cmd.extend([f"--since={since_date}"])
+            cmd.append(f"--since={since_date}")
 
         result = subprocess.run(cmd, cwd=project_root, capture_output=True, text=True)
         if result.returncode != 0:
             return ""
 
-        commits = result.stdout.strip()
+        commits = []
+        files_changed = []  # ordered, deduped
+        seen = set()
+        for line in result.stdout.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("@@@"):
+                commits.append(line[3:])
+            elif line not in seen:
+                seen.add(line)
+                files_changed.append(line)
+
         if not commits:
             return "No new commits since last narrative update."
 
-        # Also get files changed
-        cmd_files = ["git", "diff", "--stat", "--name-only"]
-        if last_commit:
-            cmd_files.append(f"{last_commit}..HEAD")
-
-        result_files = subprocess.run(cmd_files, cwd=project_root, capture_output=True, text=True)
-        files_changed = result_files.stdout.strip() if result_files.returncode == 0 else ""
-
-        output = f"## Recent Commits (since last narrative update)\n\n{commits}"
-        if files_changed:
-            # Summarize files changed
-            file_list = [f for f in files_changed.split("\n") if f and not f.startswith(".")][:15]
-            if file_list:
-                output += f"\n\n## Files Changed\n\n" + "\n".join(f"- {f}" for f in file_list)
-                if len(files_changed.split("\n")) > 15:
-                    output += f"\n- ... and {len(files_changed.split(chr(10))) - 15} more files"
+        output = "## Recent Commits (since last narrative update)\n\n" + "\n".join(commits)
+        # Summarize files changed
+        file_list = [f for f in files_changed if not f.startswith(".")][:15]
+        if file_list:
+            output += "\n\n## Files Changed\n\n" + "\n".join(f"- {f}" for f in file_list)
+            if len(files_changed) > 15:
+                output += f"\n- ... and {len(files_changed) - 15} more files"
 
         return output
     except Exception as e:
@@ -91,13 +105,9 @@ def get_git_history_since_narrative(project_root: Path, narrative_file: Path, ma
         return ""
 
 
-def update_narrative(current_narrative: str, session_summary: str) -> str:
-    """Use Claude to revise the narrative with session learnings."""
-    print("Updating narrative with Claude...", file=sys.stderr)
-
-    client = anthropic.Anthropic()
-
-    prompt = f"""You are updating a living project narrative document. Your task is to REVISE
+# Static revision instructions; kept at module scope so the API call can
+# mark them as a cacheable system block
+UPDATE_RULES = """You are updating a living project narrative document. Your task is to REVISE
 the existing narrative to incorporate new learnings from a development session.
 
 CRITICAL RULES:
@@ -116,13 +126,14 @@ Section-specific guidance:
 
 If the session didn't significantly change our understanding, the narrative can stay mostly the same.
 The goal is a **living document** that reflects current understanding, not a log of everything.
+"""
 
-CURRENT NARRATIVE:
-```markdown
-{current_narrative}
-```
 
-SESSION SUMMARY (what we worked on, learned, discovered):
+def update_narrative(current_narrative: str, session_summary: str) -> str:
+    """Use Claude to revise the narrative with session learnings."""
+    print("Updating narrative with Claude...", file=sys.stderr)
+
+    prompt = f"""SESSION SUMMARY (what we worked on, learned, discovered):
 ```
 {session_summary}
 ```
@@ -130,21 +141,32 @@ SESSION SUMMARY (what we worked on, learned, discovered):
 Output ONLY the updated narrative markdown document. No explanations or commentary.
 """
 
-    response = client.messages.create(
+    # The rules never change and the narrative changes far less often than
+    # the session summary; caching both blocks makes repeat updates within
+    # the cache TTL much cheaper and faster to first token
+    # Stream so tokens accumulate as they generate instead of blocking on
+    # the full 6000-token completion
+    chunks = []
+    with get_client().messages.stream(
         model="claude-sonnet-4-20250514",
         max_tokens=6000,
+        system=[
+            {"type": "text", "text": UPDATE_RULES,
+             "cache_control": {"type": "ephemeral"}},
+            {"type": "text",
+             "text": f"CURRENT NARRATIVE:\n```markdown\n{current_narrative}\n```",
+             "cache_control": {"type": "ephemeral"}},
+        ],
         messages=[{"role": "user", "content": prompt}]
-    )
+    ) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
 
-    result = response.content[0].text
+    result = "".join(chunks)
 
-    # Strip markdown code fences if Claude wrapped the output
-    if result.startswith("```markdown"):
-        result = result[len("```markdown"):].lstrip("\n")
-    if result.startswith("```"):
-        result = result[3:].lstrip("\n")
-    if result.endswith("```"):
-        result = result[:-3].rstrip("\n")
+    # Strip markdown code fences if Claude wrapped the output (one pass,
+    # handles both ```markdown and bare ``` plus trailing whitespace)
+    result = re.sub(r"^\s*```(?:markdown)?\s*\n?|\n?```\s*$", "", result)
 
     return result
 
@@ -202,6 +224,22 @@ def main():
 
     session_summary = "\n\n".join(session_summary_parts)
 
+    # A model round-trip costs seconds and real money; skip it when the
+    # summary says nothing new or is identical to the last one we applied
+    no_op_summaries = {
+        "No new commits since last narrative update.",
+        "## Recent Commits (since last narrative update)\n\nNo new commits since last narrative update.",
+    }
+    if session_summary.strip() in no_op_summaries:
+        print("Nothing new to incorporate; narrative left unchanged.", file=sys.stderr)
+        return
+
+    summary_hash = hashlib.blake2b(session_summary.encode()).hexdigest()[:16]
+    hash_file = project_root / ".claude" / ".narrative.last-summary-hash"
+    if hash_file.exists() and hash_file.read_text().strip() == summary_hash:
+        print("Session summary unchanged since last update; skipping.", file=sys.stderr)
+        return
+
     # Check for API key
     if not os.environ.get("ANTHROPIC_API_KEY"):
         print("Error: ANTHROPIC_API_KEY not set.", file=sys.stderr)
@@ -222,6 +260,7 @@ def main():
     print(f"Backup saved to {backup}", file=sys.stderr)
 
     narrative_file.write_text(updated_narrative)
+    hash_file.write_text(summary_hash)
     print(f"Narrative updated: {narrative_file}", file=sys.stderr)
 
     # Print summary of changes
@@ -3,6 +3,7 @@
 # requires-python = ">=3.10"
 # dependencies = [
 #     "mcp>=1.0.0",
+#     "orjson>=3.0",
 #     "tree-sitter>=0.23.0",
 #     "tree-sitter-cpp>=0.23.0",
 #     "tree-sitter-rust>=0.23.0",
@@ -16,12 +17,15 @@ Exposes tools to search symbols by name/pattern, get file symbols, and trigger r
 """
 
 import asyncio
-import fnmatch
-import hashlib
+import bisect
+import functools
 import json
 import logging
+import logging.handlers
+import mmap
 import os
-import resource
+import queue
+import re
 import signal
 import sqlite3
 import subprocess
@@ -35,6 +39,19 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+try:
+    # C JSON encoder: 2-5x faster than stdlib for the larger tool responses
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json(obj) -> str:
+    """Encode a tool response as pretty-printed JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 # Import parsing functions - add scripts dir to path
 SCRIPT_DIR = Path(__file__).parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPT_DIR))
@@ -82,7 +99,9 @@ def get_progress_path() -> Path:
     """Get progress file path for current project."""
     return get_claude_dir() / "repo-map-progress.json"
 
-# Logging setup with rotating file handler
+# Logging setup with rotating file handler. Records go through a queue:
+# logger calls on the event loop return after an enqueue, and a listener
+# thread does the formatting and disk/stderr writes.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -90,9 +109,11 @@ logger.setLevel(logging.INFO)
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(console_handler)
+_log_handlers: list[logging.Handler] = [console_handler]
 
 # File handler (rotating log) - always in session start directory
+_log_file_error = None
+log_file = None
 try:
     from logging.handlers import RotatingFileHandler
     log_dir = SESSION_START_DIR / ".claude" / "logs"
@@ -109,10 +130,20 @@ try:
     file_handler.setFormatter(logging.Formatter(
         "%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s"
     ))
-    logger.addHandler(file_handler)
-    logger.info(f"Logging to {log_file}")
+    _log_handlers.append(file_handler)
 except Exception as e:
-    logger.warning(f"Failed to setup file logging: {e}")
+    _log_file_error = e
+
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+
+if log_file is not None:
+    logger.info(f"Logging to {log_file}")
+if _log_file_error is not None:
+    logger.warning(f"Failed to setup file logging: {_log_file_error}")
 
 app = Server("context-tools-repo-map")
 
@@ -122,42 +153,104 @@ _indexing_process: subprocess.Popen | None = None  # Current indexing subprocess
 _last_index_time = 0
 _index_error: str | None = None
 
+# Cached liveness of the indexing subprocess: poll() is a waitpid syscall
+# and half a dozen call sites ask per tool call
+_proc_state_cache: tuple[float, bool] = (0.0, False)
 
-def set_subprocess_limits():
-    """
-    Set resource limits for indexing subprocess (Unix only).
-    Called via preexec_fn in subprocess.Popen.
-    """
-    try:
-        # Limit memory to 4GB (generous, catches runaway allocations)
-        # RLIMIT_AS = virtual memory address space
-        memory_limit = 4 * 1024 * 1024 * 1024  # 4GB in bytes
-        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
-    except (ValueError, OSError, AttributeError) as e:
-        # May fail on some systems or if resource module unavailable
-        pass
+# Set when a tracked indexing subprocess exits, so waiters wake immediately
+# instead of discovering it on their next poll
+_indexing_done = threading.Event()
+
+
+def _is_indexing() -> bool:
+    """Whether the tracked indexing subprocess is currently running (250ms TTL)."""
+    global _proc_state_cache
+    ts, alive = _proc_state_cache
+    now = time.monotonic()
+    if now - ts < 0.25:
+        return alive
+    alive = _indexing_process is not None and _indexing_process.poll() is None
+    _proc_state_cache = (now, alive)
+    return alive
+
+
+# One long-lived read-only connection per database path: connection setup
+# dominates small queries, and WAL lets this reader coexist with the indexer.
+# Callers must NOT close the returned connection.
+_db_conn: sqlite3.Connection | None = None
+_db_conn_path: Path | None = None
 
-    try:
-        # Limit CPU time to 20 minutes (watchdog catches at 10 min wall-clock time)
-        cpu_time_limit = 1200  # 20 minutes in seconds
-        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
-    except (ValueError, OSError, AttributeError):
-        pass
+
+def _close_db_conn() -> None:
+    global _db_conn, _db_conn_path, _db_conn_has_fts, _db_conn_has_files
+    _db_conn_has_fts = None
+    _db_conn_has_files = None
+    if _db_conn is not None:
+        try:
+            _db_conn.close()
+        except sqlite3.Error:
+            pass
+    _db_conn = None
+    _db_conn_path = None
 
 
 def get_db() -> sqlite3.Connection:
-    """Get a database connection with row factory."""
+    """Get the shared read-only, pragma-tuned database connection."""
+    global _db_conn, _db_conn_path
     db_path = get_db_path()
     if not db_path.exists():
+        _close_db_conn()
         raise FileNotFoundError(f"Repo map database not found at {db_path}. Use reindex_repo_map tool.")
-    conn = sqlite3.connect(db_path, timeout=5.0)
+
+    # Reuse unless the project (and so the database path) changed
+    if _db_conn is not None and _db_conn_path == db_path:
+        return _db_conn
+    _close_db_conn()
+
+    # Query tools never write; mode=ro skips write-locking work and WAL
+    # (set by the indexer) lets reads proceed during a background reindex
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=5.0,
+                           check_same_thread=False, cached_statements=256)
+    conn.executescript(
+        "PRAGMA mmap_size=268435456;"  # read pages via mmap instead of read()
+        "PRAGMA cache_size=-20000;"    # ~20MB page cache
+        "PRAGMA temp_store=MEMORY;"
+    )
     conn.row_factory = sqlite3.Row
+    _db_conn, _db_conn_path = conn, db_path
     return conn
 
 
-def row_to_dict(row: sqlite3.Row) -> dict:
-    """Convert a sqlite3.Row to a dictionary."""
-    return {key: row[key] for key in row.keys()}
+# Whether the shared connection's database carries the trigram FTS mirror
+# and the files table (sqlite3.Connection can't hold attributes; reset
+# when get_db reconnects)
+_db_conn_has_fts: bool | None = None
+_db_conn_has_files: bool | None = None
+
+
+def _has_symbol_fts(conn: sqlite3.Connection) -> bool:
+    """Whether this database carries the trigram FTS mirror (cached)."""
+    global _db_conn_has_fts
+    if _db_conn_has_fts is None:
+        _db_conn_has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='symbols_fts'"
+        ).fetchone() is not None
+    return _db_conn_has_fts
+
+
+def _has_files_table(conn: sqlite3.Connection) -> bool:
+    """Whether this database carries the files table (cached)."""
+    global _db_conn_has_files
+    if _db_conn_has_files is None:
+        _db_conn_has_files = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='files'"
+        ).fetchone() is not None
+    return _db_conn_has_files
+
+
+# Columns the listing tools actually render; get_symbol_content still
+# selects * because it needs the byte spans too
+SYMBOL_COLS = "name, kind, signature, docstring, file_path, line_number, parent"
 
 
 def check_subprocess_exit_status():
@@ -204,14 +297,27 @@ def check_subprocess_exit_status():
         _indexing_process = None
 
 
+# DB mtime at the last watchdog tick: unchanged mtime + no tracked
+# indexer means there is nothing for the watchdog to inspect
+_last_watchdog_db_mtime: int | None = None
+
+
 def check_indexing_watchdog():
     """Check if indexing is stuck and KILL the hung subprocess."""
-    global _indexing_process
+    global _indexing_process, _last_watchdog_db_mtime
 
     db_path = get_db_path()
     if not db_path.exists():
         return
 
+    try:
+        db_mtime = db_path.stat().st_mtime_ns
+    except OSError:
+        return
+    if _indexing_process is None and db_mtime == _last_watchdog_db_mtime:
+        return  # steady-state idle: skip the SQLite read entirely
+    _last_watchdog_db_mtime = db_mtime
+
     try:
         conn = sqlite3.connect(db_path, timeout=5.0)
         conn.row_factory = sqlite3.Row
@@ -258,7 +364,94 @@ def check_indexing_watchdog():
         logger.error(f"Watchdog check failed: {e}")
 
 
+# Memoized is_stale result: (monotonic timestamp, stale, reason).
+# Status calls, tool-call error paths, and the periodic checker all probe
+# staleness; the TTL stops them from re-walking the filesystem back to back.
+_stale_cache: tuple[float, bool, str] | None = None
+_stale_cache_lock = threading.Lock()
+STALENESS_CACHE_TTL = 5.0  # seconds
+
+
+def _invalidate_stale_cache() -> None:
+    """Drop the memoized staleness result (e.g. when indexing state changes)."""
+    global _stale_cache
+    with _stale_cache_lock:
+        _stale_cache = None
+
+
 def is_stale(full_check: bool = False) -> tuple[bool, str]:
+    """Check if the repo map needs reindexing, memoized with a short TTL."""
+    global _stale_cache
+    with _stale_cache_lock:
+        if _stale_cache is not None and time.monotonic() - _stale_cache[0] < STALENESS_CACHE_TTL:
+            return _stale_cache[1], _stale_cache[2]
+
+    stale, reason = _is_stale_uncached(full_check)
+
+    with _stale_cache_lock:
+        _stale_cache = (time.monotonic(), stale, reason)
+    return stale, reason
+
+
+# Parsed repo-map cache JSON memoized by (path, mtime_ns): the file can be
+# tens of MB and only changes when the indexer rewrites it
+_cache_data_memo: tuple[Path, int, dict] | None = None
+
+
+def _load_cache_data(cache_path: Path) -> dict:
+    """Load (or reuse) the parsed repo-map cache JSON."""
+    global _cache_data_memo
+    mtime_ns = cache_path.stat().st_mtime_ns
+    if (_cache_data_memo is not None
+            and _cache_data_memo[0] == cache_path
+            and _cache_data_memo[1] == mtime_ns):
+        return _cache_data_memo[2]
+    raw = cache_path.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _cache_data_memo = (cache_path, mtime_ns, data)
+    return data
+
+
+SOURCE_EXTENSIONS = frozenset(
+    {".py", ".rs", ".cpp", ".cc", ".cxx", ".hpp", ".h", ".hxx", ".mm", ".metal"})
+
+
+def _walk_sources(root: Path, db_mtime: float, sample_budget: int = 100) -> tuple[int, bool]:
+    """Count source files and spot files newer than db_mtime in one walk.
+
+    Folds the old walk-then-stat-100-files sequence into a single scandir
+    pass; returns (count, newer_found), bailing out of the stat sampling
+    as soon as one newer file is seen.
+    """
+    indexer = get_indexer()
+    count = 0
+    newer = False
+    sampled = 0
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name in indexer.EXCLUDE_DIRS:
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1] in SOURCE_EXTENSIONS:
+                        count += 1
+                        if not newer and sampled < sample_budget:
+                            sampled += 1
+                            try:
+                                if entry.stat(follow_symlinks=False).st_mtime > db_mtime:
+                                    newer = True
+                            except OSError:
+                                pass
+        except OSError:
+            continue
+    return count, newer
+
+
+def _is_stale_uncached(full_check: bool = False) -> tuple[bool, str]:
     """
     Check if the repo map needs reindexing.
     Returns (is_stale, reason).
@@ -285,28 +478,24 @@ def is_stale(full_check: bool = False) -> tuple[bool, str]:
 
     # Check cache version
     try:
-        cache_data = json.loads(cache_path.read_text())
+        cache_data = _load_cache_data(cache_path)
         if cache_data.get("version") != indexer.CACHE_VERSION:
             return True, f"cache version mismatch"
-    except (json.JSONDecodeError, IOError):
+    except (ValueError, OSError):
         return True, "cache file corrupt"
 
     if full_check:
-        # Full filesystem walk — expensive on large repos but detects new/deleted files
+        # Full filesystem walk — expensive on large repos but detects
+        # new/deleted files. Counting and the mtime sampling share one pass.
         cached_count = cache_data.get("found_file_count", len(cache_data.get("files", {})))
-        current_files = []
-        for ext in [".py", ".rs", ".cpp", ".cc", ".cxx", ".hpp", ".h", ".hxx", ".mm", ".metal"]:
-            current_files.extend(indexer.find_files(project_root, {ext}))
-        current_count = len(current_files)
+        db_mtime = db_path.stat().st_mtime
+        current_count, newer_found = _walk_sources(project_root, db_mtime)
+
+        if newer_found:
+            return True, "files modified since last index"
 
         if current_count != cached_count:
             return True, f"file count changed ({cached_count} cached, {current_count} found)"
-
-        # Sample mtime check from the full file list
-        db_mtime = db_path.stat().st_mtime
-        for f in current_files[:100]:
-            if f.stat().st_mtime > db_mtime:
-                return True, "files modified since last index"
     else:
         # Fast path: sample mtime check using cached file paths (no filesystem walk)
         db_mtime = db_path.stat().st_mtime
@@ -358,7 +547,7 @@ def do_index() -> tuple[bool, str]:
     Spawn subprocess to perform indexing.
     Returns (success, message).
     """
-    global _indexing_process, _last_index_time, _index_error
+    global _indexing_process, _last_index_time, _index_error, _proc_state_cache
 
     with _indexing_lock:
         if _indexing_process and _indexing_process.poll() is None:
@@ -376,19 +565,33 @@ def do_index() -> tuple[bool, str]:
         # Ensure .claude directory exists
         claude_dir.mkdir(exist_ok=True)
 
-        # Spawn subprocess to run the indexer with resource limits
+        # Spawn the indexer via the limits wrapper: the child applies its
+        # own rlimits, so no preexec_fn is needed and Popen stays on the
+        # fast posix_spawn path
         proc = subprocess.Popen(
-            ["uv", "run", str(SCRIPT_DIR / "map.py"), str(project_root)],
+            [sys.executable, str(SCRIPT_DIR / "run-indexer.py"), str(project_root)],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            preexec_fn=set_subprocess_limits,  # Set resource limits (Unix only)
+            # MCP tools only read the database; skip the similarity scan and
+            # markdown report (commands that want it run map.py directly)
+            env={**os.environ, "REPO_MAP_SKIP_MARKDOWN": "1"},
         )
 
         with _indexing_lock:
             _indexing_process = proc
 
         _last_index_time = time.time()
+        _proc_state_cache = (time.monotonic(), True)
+        _invalidate_stale_cache()
+        _indexing_done.clear()
+
+        def _watch_exit(p: subprocess.Popen) -> None:
+            p.wait()
+            _invalidate_stale_cache()
+            _indexing_done.set()
+
+        threading.Thread(target=_watch_exit, args=(proc,), daemon=True).start()
         logger.info(f"Indexing subprocess started (PID: {proc.pid})")
 
         return True, f"indexing started in subprocess (PID: {proc.pid})"
@@ -655,7 +858,7 @@ async def wait_for_indexing(timeout_seconds: int = 60) -> tuple[bool, str]:
     """
     start = time.time()
     while time.time() - start < timeout_seconds:
-        status = repo_map_status()
+        status = await asyncio.to_thread(repo_map_status)
 
         if status.get("index_status") == "completed":
             return True, "indexing completed"
@@ -664,7 +867,13 @@ async def wait_for_indexing(timeout_seconds: int = 60) -> tuple[bool, str]:
             error = status.get("error", "unknown error")
             return False, f"indexing failed: {error}"
 
-        await asyncio.sleep(1)  # Poll every second
+        remaining = timeout_seconds - (time.time() - start)
+        if _is_indexing():
+            # Our own subprocess: block on its exit event and wake the
+            # moment it finishes instead of rediscovering it next poll
+            await asyncio.to_thread(_indexing_done.wait, max(0.1, remaining))
+        else:
+            await asyncio.sleep(1)  # external indexer: poll its DB status
 
     return False, "timeout waiting for indexing"
 
@@ -708,6 +917,15 @@ def _check_update_trigger():
             logger.warning(f"Failed to spawn update-context.sh: {e}")
 
 
+# Static skeleton for the indexing-in-progress reply, encoded once
+_INDEXING_MESSAGE = "Index is building. Try again in a moment or use repo_map_status to check progress."
+_INDEXING_RESPONSE_NOPROGRESS = dump_json({
+    "status": "indexing_in_progress",
+    "message": _INDEXING_MESSAGE,
+    "partial_results": []
+})
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls."""
@@ -725,89 +943,39 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     if name not in ["repo_map_status", "reindex_repo_map", "wait_for_index",
                      "md_outline", "md_get_section", "md_list_tables", "md_get_table", "md_list_figures",
                      "save_session_context"]:
-        try:
-            if db_path.exists():
-                conn = sqlite3.connect(db_path, timeout=5.0)
+        # In-process subprocess state answers the common case for free;
+        # the metadata probe (for externally-started indexers) reuses the
+        # shared connection off the event loop instead of a fresh connect
+        indexing = _is_indexing()
+        if not indexing and db_path.exists():
+            def _db_status() -> str | None:
                 try:
-                    cursor = conn.execute("SELECT value FROM metadata WHERE key = 'status'")
-                    row = cursor.fetchone()
-                    if row and row[0] == "indexing":
-                        logger.info("Indexing in progress, waiting up to 15 seconds...")
-                        success, msg = await wait_for_indexing(timeout_seconds=15)
-                        if not success:
-                            # Don't return error - return progress information instead
-                            progress = get_indexing_progress()
-                            if progress:
-                                return [TextContent(type="text", text=json.dumps({
-                                    "status": "indexing_in_progress",
-                                    "message": "Index is building. Try again in a moment or use repo_map_status to check progress.",
-                                    "progress": progress,
-                                    "partial_results": []
-                                }, indent=2))]
-                            else:
-                                return [TextContent(type="text", text=json.dumps({
-                                    "status": "indexing_in_progress",
-                                    "message": "Index is building. Try again in a moment or use repo_map_status to check progress.",
-                                    "partial_results": []
-                                }, indent=2))]
-                except sqlite3.OperationalError:
-                    pass  # Metadata table doesn't exist yet
-                finally:
-                    conn.close()
-        except Exception:
-            pass  # DB doesn't exist yet
+                    row = get_db().execute("SELECT value FROM metadata WHERE key = 'status'").fetchone()
+                    return row[0] if row else None
+                except (sqlite3.Error, FileNotFoundError):
+                    return None  # DB/metadata not there yet
+            indexing = (await asyncio.to_thread(_db_status)) == "indexing"
+
+        if indexing:
+            logger.info("Indexing in progress, waiting up to 15 seconds...")
+            success, msg = await wait_for_indexing(timeout_seconds=15)
+            if not success:
+                # Don't return error - return progress information instead
+                progress = get_indexing_progress()
+                if not progress:
+                    # Common cold-start burst: serve the precomputed text
+                    return [TextContent(type="text", text=_INDEXING_RESPONSE_NOPROGRESS)]
+                return [TextContent(type="text", text=dump_json({
+                    "status": "indexing_in_progress",
+                    "message": _INDEXING_MESSAGE,
+                    "progress": progress,
+                    "partial_results": []
+                }))]
 
     try:
-        if name == "search_symbols":
-            result = search_symbols(
-                pattern=arguments["pattern"],
-                kind=arguments.get("kind"),
-                limit=arguments.get("limit", 20)
-            )
-        elif name == "get_file_symbols":
-            result = get_file_symbols(file=arguments["file"])
-        elif name == "get_symbol_content":
-            result = get_symbol_content(
-                name=arguments["name"],
-                kind=arguments.get("kind")
-            )
-        elif name == "reindex_repo_map":
-            result = reindex_repo_map(force=arguments.get("force", False))
-        elif name == "repo_map_status":
-            result = repo_map_status()
-        elif name == "wait_for_index":
-            timeout = arguments.get("timeout_seconds", 60)
-            success, msg = await wait_for_indexing(timeout_seconds=timeout)
-            result = {"success": success, "message": msg}
-        elif name == "list_files":
-            result = list_files(
-                pattern=arguments.get("pattern"),
-                limit=arguments.get("limit", 100)
-            )
-        elif name == "md_outline":
-            result = md_outline(file_path=arguments["file_path"])
-        elif name == "md_get_section":
-            result = md_get_section(
-                file_path=arguments["file_path"],
-                heading=arguments["heading"]
-            )
-        elif name == "md_list_tables":
-            result = md_list_tables(file_path=arguments["file_path"])
-        elif name == "md_get_table":
-            result = md_get_table(
-                file_path=arguments["file_path"],
-                index=arguments["index"]
-            )
-        elif name == "md_list_figures":
-            result = md_list_figures(file_path=arguments["file_path"])
-        elif name == "save_session_context":
-            import context_saver
-            result = context_saver.save_session_context(
-                project_root=str(get_project_root()),
-                **arguments
-            )
-            # Check for pending git-based update trigger
-            _check_update_trigger()
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is not None:
+            result = await handler(arguments)
         else:
             result = {"error": f"Unknown tool: {name}"}
             logger.error(f"Unknown tool: {name}")
@@ -826,207 +994,253 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if isinstance(result, str):
             return [TextContent(type="text", text=result)]
         else:
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            return [TextContent(type="text", text=dump_json(result))]
     except FileNotFoundError as e:
         # DB doesn't exist - trigger indexing
         logger.info(f"DB not found, triggering indexing for tool {name}")
         stale, reason = is_stale()
-        is_indexing = _indexing_process is not None and _indexing_process.poll() is None
+        is_indexing = _is_indexing()
         if stale and not is_indexing:
             index_in_background()
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=dump_json({
             "error": str(e),
             "status": "indexing started in background" if not is_indexing else "indexing in progress"
         }))]
     except Exception as e:
         logger.exception(f"Tool {name} failed with exception")
-        return [TextContent(type="text", text=json.dumps({"error": f"Tool error: {e}"}))]
+        return [TextContent(type="text", text=dump_json({"error": f"Tool error: {e}"}))]
 
 
 def search_symbols(pattern: str, kind: str | None = None, limit: int = 20) -> str:
     """Search for symbols by name pattern. Returns markdown."""
     conn = get_db()
-    try:
-        # Convert glob pattern to SQL LIKE pattern
-        sql_pattern = pattern.replace("*", "%").replace("?", "_")
-
-        query = "SELECT * FROM symbols WHERE name LIKE ?"
-        params: list = [sql_pattern]
-
-        if kind:
-            query += " AND kind = ?"
-            params.append(kind)
+    # Decide the match strategy once: plain names hit the index via LIKE,
+    # globs use SQLite's native GLOB (same */?/[] semantics as fnmatch,
+    # evaluated in C with index-prefix optimization, no Python callback).
+    # Leading-wildcard globs can't use the name index, so when the pattern
+    # carries a literal run of 3+ chars, prefilter via the trigram FTS
+    # mirror before the exact GLOB check.
+    if any(ch in pattern for ch in "*?["):
+        # For the FTS prefilter, treat bracket expressions as wildcards
+        # before picking the literal run — the contents of [CDL] are
+        # alternatives, not a required substring
+        literal = max(re.split(r"[*?]+", re.sub(r"\[[^\]]*\]", "*", pattern)), key=len)
+        if pattern[0] in "*?[" and len(literal) >= 3 and _has_symbol_fts(conn):
+            query = (f"SELECT {SYMBOL_COLS} FROM symbols "
+                     "WHERE id IN (SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH ?) "
+                     "AND name GLOB ?")
+            params: list = ['"' + literal.replace('"', '""') + '"', pattern]
+        else:
+            query = f"SELECT {SYMBOL_COLS} FROM symbols WHERE name GLOB ?"
+            params = [pattern]
+    else:
+        # NOCASE equality keeps LIKE's case-insensitive lookup without
+        # treating underscores in symbol names as single-char wildcards
+        query = f"SELECT {SYMBOL_COLS} FROM symbols WHERE name = ? COLLATE NOCASE"
+        params = [pattern]
 
-        query += " ORDER BY name LIMIT ?"
-        params.append(limit)
+    if kind:
+        query += " AND kind = ?"
+        params.append(kind)
 
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
+    query += " ORDER BY name LIMIT ?"
+    params.append(limit)
 
-        # If SQL LIKE didn't match well, fall back to fnmatch for proper glob
-        results = []
-        for row in rows:
-            if fnmatch.fnmatch(row["name"], pattern):
-                results.append(row)
+    cursor = conn.execute(query, params)
+    results = cursor.fetchall()
 
-        # If no results with strict fnmatch, return SQL results
-        if not results:
-            results = list(rows)
+    if not results:
+        return f"No symbols found matching pattern: `{pattern}`"
 
-        results = results[:limit]
+    # Format as markdown (append+join: repeated str += is quadratic)
+    parts = [f"## Found {len(results)} symbol(s) matching `{pattern}`\n\n"]
+    for row in results:
+        name = row["name"]
+        kind_str = row["kind"]
+        path = row["file_path"]
+        line = row["line_number"]
 
-        if not results:
-            return f"No symbols found matching pattern: `{pattern}`"
+        if row["parent"]:
+            name = f"{row['parent']}.{name}"
 
-        # Format as markdown
-        md = f"## Found {len(results)} symbol(s) matching `{pattern}`\n\n"
-        for row in results:
-            name = row["name"]
-            kind_str = row["kind"]
-            path = row["file_path"]
-            line = row["line_number"]
+        parts.append(f"- **{name}** ({kind_str}) - `{path}:{line}`\n")
 
-            if row["parent"]:
-                name = f"{row['parent']}.{name}"
+        if row["docstring"]:
+            # The indexer stores only the (<=100 char) first line already;
+            # just cap the display width
+            doc = row["docstring"]
+            if len(doc) > 80:
+                doc = doc[:77] + "..."
+            parts.append(f"  _{doc}_\n")
 
-            md += f"- **{name}** ({kind_str}) - `{path}:{line}`\n"
-
-            if row["docstring"]:
-                # First line of docstring only
-                first_line = row["docstring"].split("\n")[0]
-                if len(first_line) > 80:
-                    first_line = first_line[:77] + "..."
-                md += f"  _{first_line}_\n"
-
-        return md
-    finally:
-        conn.close()
+    return "".join(parts)
 
 
 def get_file_symbols(file: str) -> str:
     """Get all symbols in a specific file. Returns markdown."""
     conn = get_db()
-    try:
-        cursor = conn.execute(
-            "SELECT * FROM symbols WHERE file_path = ? ORDER BY line_number",
-            [file]
-        )
-        rows = cursor.fetchall()
+    cursor = conn.execute(
+        f"SELECT {SYMBOL_COLS} FROM symbols WHERE file_path = ? ORDER BY line_number",
+        [file]
+    )
+    rows = cursor.fetchall()
 
-        if not rows:
-            return f"No symbols found in file: `{file}`"
+    if not rows:
+        return f"No symbols found in file: `{file}`"
 
-        # Format as markdown
-        md = f"## Symbols in `{file}`\n\n"
-        md += f"Found {len(rows)} symbol(s):\n\n"
+    # Format as markdown (append+join: repeated str += is quadratic)
+    parts = [f"## Symbols in `{file}`\n\n",
+             f"Found {len(rows)} symbol(s):\n\n"]
 
-        for row in rows:
-            name = row["name"]
-            kind = row["kind"]
-            line = row["line_number"]
+    for row in rows:
+        name = row["name"]
+        kind = row["kind"]
+        line = row["line_number"]
 
-            if row["parent"]:
-                name = f"{row['parent']}.{name}"
+        if row["parent"]:
+            name = f"{row['parent']}.{name}"
 
-            md += f"- **{name}** ({kind}) - line {line}\n"
+        parts.append(f"- **{name}** ({kind}) - line {line}\n")
 
-            if row["signature"]:
-                md += f"  `{row['signature']}`\n"
+        if row["signature"]:
+            parts.append(f"  `{row['signature']}`\n")
 
-            if row["docstring"]:
-                # First line of docstring only
-                first_line = row["docstring"].split("\n")[0]
-                if len(first_line) > 80:
-                    first_line = first_line[:77] + "..."
-                md += f"  _{first_line}_\n"
+        if row["docstring"]:
+            # The indexer stores only the (<=100 char) first line already;
+            # just cap the display width
+            doc = row["docstring"]
+            if len(doc) > 80:
+                doc = doc[:77] + "..."
+            parts.append(f"  _{doc}_\n")
+
+    return "".join(parts)
 
-        return md
-    finally:
-        conn.close()
+
+# Fixed statements for get_symbol_content's four dispatch shapes
+SQL_CONTENT_BY_NAME = "SELECT * FROM symbols WHERE name = ?"
+SQL_CONTENT_BY_NAME_KIND = SQL_CONTENT_BY_NAME + " AND kind = ?"
+SQL_CONTENT_BY_NAME_PARENT = SQL_CONTENT_BY_NAME + " AND parent = ?"
+SQL_CONTENT_BY_NAME_PARENT_KIND = SQL_CONTENT_BY_NAME_PARENT + " AND kind = ?"
 
 
 def get_symbol_content(name: str, kind: str | None = None) -> str:
     """Get the source code content of a symbol by exact name. Returns markdown."""
     conn = get_db()
     project_root = get_project_root()
-    try:
-        # Handle Parent.method format
-        if "." in name:
-            parent, method_name = name.rsplit(".", 1)
-            query = "SELECT * FROM symbols WHERE name = ? AND parent = ?"
-            params: list = [method_name, parent]
+    # Handle Parent.method format; the four fixed query constants keep
+    # sqlite3's statement cache hitting instead of re-preparing built strings
+    if "." in name:
+        parent, method_name = name.rsplit(".", 1)
+        if kind:
+            query, params = SQL_CONTENT_BY_NAME_PARENT_KIND, [method_name, parent, kind]
         else:
-            query = "SELECT * FROM symbols WHERE name = ?"
-            params = [name]
+            query, params = SQL_CONTENT_BY_NAME_PARENT, [method_name, parent]
+    elif kind:
+        query, params = SQL_CONTENT_BY_NAME_KIND, [name, kind]
+    else:
+        query, params = SQL_CONTENT_BY_NAME, [name]
 
-        if kind:
-            query += " AND kind = ?"
-            params.append(kind)
+    # LIMIT 2 answers "unique or ambiguous?" without decoding every match
+    cursor = conn.execute(query + " LIMIT 2", params)
+    rows = cursor.fetchall()
+
+    if not rows:
+        return f"❌ Symbol `{name}` not found"
 
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
+    # If multiple matches, return info about all of them (rare: re-query
+    # without the probe limit so the listing is complete)
+    if len(rows) > 1 and kind is None:
+        rows = conn.execute(query, params).fetchall()
+        parts = [f"❌ Multiple symbols named `{name}` found. Specify 'kind' to disambiguate.\n\n",
+                 f"Found {len(rows)} matches:\n\n"]
+        for row in rows:
+            display_name = f"{row['parent']}.{row['name']}" if row["parent"] else row["name"]
+            parts.append(f"- **{display_name}** ({row['kind']}) - `{row['file_path']}:{row['line_number']}`\n")
+        return "".join(parts)
 
-        if not rows:
-            return f"❌ Symbol `{name}` not found"
+    row = rows[0]
+    file_path = project_root / row["file_path"]
 
-        # If multiple matches, return info about all of them
-        if len(rows) > 1 and kind is None:
-            md = f"❌ Multiple symbols named `{name}` found. Specify 'kind' to disambiguate.\n\n"
-            md += f"Found {len(rows)} matches:\n\n"
-            for row in rows:
-                display_name = f"{row['parent']}.{row['name']}" if row["parent"] else row["name"]
-                md += f"- **{display_name}** ({row['kind']}) - `{row['file_path']}:{row['line_number']}`\n"
-            return md
+    if not file_path.exists():
+        return f"❌ File not found: `{row['file_path']}`"
 
-        row = rows[0]
-        file_path = project_root / row["file_path"]
+    start_line = row["line_number"]
+    end_line = row["end_line_number"]
+    if end_line is None:
+        # Fallback: return just the start line and a few following lines
+        end_line = start_line + 20
 
-        if not file_path.exists():
-            return f"❌ File not found: `{row['file_path']}`"
+    # Fast path: the index recorded the symbol's byte span, so one seek+read
+    # fetches exactly the content with no line scanning at all
+    try:
+        start_byte, end_byte = row["start_byte"], row["end_byte"]
+    except IndexError:
+        start_byte = end_byte = None  # older database without span columns
 
-        # Read file content
+    if start_byte is not None and end_byte is not None:
         try:
-            lines = file_path.read_text(encoding="utf-8").splitlines()
-        except (IOError, UnicodeDecodeError) as e:
+            with open(file_path, "rb") as f:
+                f.seek(start_byte)
+                data = f.read(end_byte - start_byte)
+            content = data.decode("utf-8", errors="replace").rstrip("\n")
+            md_end_line = start_line + content.count("\n")
+            return _format_symbol_content(row, content, start_line, md_end_line)
+        except (IOError, OSError) as e:
             return f"❌ Could not read file: {e}"
 
-        start_line = row["line_number"]
-        end_line = row["end_line_number"]
+    # Memory-map the file and slice just the requested line range instead of
+    # materializing the whole file as a list of str lines
+    try:
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start_off = 0
+            line = 1
+            while line < start_line:
+                pos = mm.find(b"\n", start_off)
+                if pos == -1:
+                    break
+                start_off = pos + 1
+                line += 1
+            end_off = start_off
+            while line <= end_line:
+                pos = mm.find(b"\n", end_off)
+                if pos == -1:
+                    end_off = len(mm)
+                    break
+                end_off = pos + 1
+                line += 1
+            content = mm[start_off:end_off].decode("utf-8", errors="replace").rstrip("\n")
+    except (IOError, ValueError, OSError) as e:
+        return f"❌ Could not read file: {e}"
 
-        if end_line is None:
-            # Fallback: return just the start line and a few following lines
-            end_line = min(start_line + 20, len(lines))
+    end_line = start_line + content.count("\n")
+    return _format_symbol_content(row, content, start_line, end_line)
 
-        # Extract content (convert to 0-indexed)
-        content_lines = lines[start_line - 1:end_line]
-        content = "\n".join(content_lines)
 
-        # Detect language for syntax highlighting
-        file_ext = Path(row["file_path"]).suffix.lstrip(".")
-        lang_map = {"py": "python", "js": "javascript", "ts": "typescript", "rs": "rust", "c": "c", "cpp": "cpp", "h": "c", "hpp": "cpp"}
-        lang = lang_map.get(file_ext, file_ext)
+def _format_symbol_content(row: sqlite3.Row, content: str, start_line: int, end_line: int) -> str:
+    """Render a symbol's source content as markdown."""
+    # Detect language for syntax highlighting
+    file_ext = Path(row["file_path"]).suffix.lstrip(".")
+    lang_map = {"py": "python", "js": "javascript", "ts": "typescript", "rs": "rust", "c": "c", "cpp": "cpp", "h": "c", "hpp": "cpp"}
+    lang = lang_map.get(file_ext, file_ext)
 
-        # Build markdown
-        display_name = f"{row['parent']}.{row['name']}" if row["parent"] else row["name"]
-        md = f"## {display_name} ({row['kind']})\n\n"
-        md += f"**Location:** `{row['file_path']}:{start_line}-{end_line}`\n\n"
+    display_name = f"{row['parent']}.{row['name']}" if row["parent"] else row["name"]
+    parts = [f"## {display_name} ({row['kind']})\n\n",
+             f"**Location:** `{row['file_path']}:{start_line}-{end_line}`\n\n"]
 
-        if row["signature"]:
-            md += f"**Signature:** `{row['signature']}`\n\n"
+    if row["signature"]:
+        parts.append(f"**Signature:** `{row['signature']}`\n\n")
 
-        if row["docstring"]:
-            md += f"**Documentation:**\n```\n{row['docstring']}\n```\n\n"
+    if row["docstring"]:
+        parts.append(f"**Documentation:**\n```\n{row['docstring']}\n```\n\n")
 
-        md += f"**Source Code:**\n```{lang}\n{content}\n```\n"
+    parts.append(f"**Source Code:**\n```{lang}\n{content}\n```\n")
 
-        return md
-    finally:
-        conn.close()
+    return "".join(parts)
 
 
 def reindex_repo_map(force: bool = False) -> dict:
     """Trigger a reindex of the repository."""
-    is_indexing = _indexing_process is not None and _indexing_process.poll() is None
+    is_indexing = _is_indexing()
 
     if is_indexing:
         return {"status": "indexing already in progress"}
@@ -1043,7 +1257,7 @@ def reindex_repo_map(force: bool = False) -> dict:
 
 def repo_map_status() -> dict:
     """Get current index status."""
-    is_indexing = _indexing_process is not None and _indexing_process.poll() is None
+    is_indexing = _is_indexing()
     project_root = get_project_root()
     db_path = get_db_path()
     status = {
@@ -1097,8 +1311,6 @@ def repo_map_status() -> dict:
                 cursor = conn.execute("SELECT COUNT(*) FROM symbols")
                 status["symbol_count"] = cursor.fetchone()[0]
                 status["index_status"] = "unknown (old DB format)"
-
-            conn.close()
         except Exception as e:
             status["db_error"] = str(e)
 
@@ -1161,71 +1373,114 @@ def list_files(pattern: str | None = None, limit: int = 100) -> str:
     Much faster than find/ls - queries pre-built index. Returns markdown.
     """
     conn = get_db()
-    try:
-        # Get distinct file paths from symbols table
-        query = "SELECT DISTINCT file_path FROM symbols"
-        params: list = []
+    # The files table has one row per indexed file; DISTINCT over all
+    # symbol rows remains only for databases that predate it
+    table = "files" if _has_files_table(conn) else "symbols"
+    distinct = "" if table == "files" else "DISTINCT "
+    query = f"SELECT {distinct}file_path FROM {table}"
+    params: list = []
+
+    # Apply glob pattern filtering if provided
+    if pattern:
+        # Convert glob pattern to SQL LIKE pattern
+        sql_pattern = pattern.replace("*", "%").replace("?", "_")
+        query += " WHERE file_path LIKE ?"
+        params.append(sql_pattern)
 
-        # Apply glob pattern filtering if provided
-        if pattern:
-            # Convert glob pattern to SQL LIKE pattern
-            sql_pattern = pattern.replace("*", "%").replace("?", "_")
-            query += " WHERE file_path LIKE ?"
-            params.append(sql_pattern)
+    query += " ORDER BY file_path LIMIT ?"
+    params.append(limit)
 
-        query += " ORDER BY file_path LIMIT ?"
-        params.append(limit)
+    cursor = conn.execute(query, params)
+    # Iterate the cursor directly: no intermediate Row list before the
+    # path extraction (sqlite3 block-fetches underneath)
+    files = [row["file_path"] for row in cursor]
 
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
+    if not files:
+        pattern_str = f" matching `{pattern}`" if pattern else ""
+        return f"No files found{pattern_str}"
+
+    # Format as markdown (append+join: repeated str += is quadratic)
+    pattern_str = f" matching `{pattern}`" if pattern else ""
+    parts = [f"## Found {len(files)} file(s){pattern_str}\n\n"]
+
+    # Group by directory for better readability. rpartition does the
+    # membership test and split in one C call (paths are POSIX-style).
+    dirs = {}
+    for file in files:
+        head, sep, tail = file.rpartition("/")
+        dir_name = head if sep else "."
+        file_name = tail
+
+        if dir_name not in dirs:
+            dirs[dir_name] = []
+        dirs[dir_name].append(file_name)
+
+    # Output grouped by directory
+    for dir_name in sorted(dirs.keys()):
+        if dir_name == ".":
+            parts.append("**Root directory:**\n")
+        else:
+            parts.append(f"**`{dir_name}/`:**\n")
 
-        files = [row["file_path"] for row in rows]
+        for file_name in sorted(dirs[dir_name]):
+            parts.append(f"- {file_name}\n")
 
-        if not files:
-            pattern_str = f" matching `{pattern}`" if pattern else ""
-            return f"No files found{pattern_str}"
+        parts.append("\n")
 
-        # Format as markdown
-        pattern_str = f" matching `{pattern}`" if pattern else ""
-        md = f"## Found {len(files)} file(s){pattern_str}\n\n"
-
-        # Group by directory for better readability
-        dirs = {}
-        for file in files:
-            if "/" in file:
-                dir_name = file.rsplit("/", 1)[0]
-                file_name = file.rsplit("/", 1)[1]
-            else:
-                dir_name = "."
-                file_name = file
+    if len(files) >= limit:
+        parts.append(f"\n*Showing first {limit} files. Use `limit` parameter to see more.*\n")
 
-            if dir_name not in dirs:
-                dirs[dir_name] = []
-            dirs[dir_name].append(file_name)
+    return "".join(parts)
 
-        # Output grouped by directory
-        for dir_name in sorted(dirs.keys()):
-            if dir_name == ".":
-                md += "**Root directory:**\n"
-            else:
-                md += f"**`{dir_name}/`:**\n"
 
-            for file_name in sorted(dirs[dir_name]):
-                md += f"- {file_name}\n"
+# ============================================================================
+# Markdown Navigation Tools
+# ============================================================================
 
-            md += "\n"
+# Patterns compiled once at module load (not per call/per line)
+_HEADING_RE = re.compile(r"^(#+)\s*(.*\S)\s*$")
+_IMG_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
 
-        if len(files) >= limit:
-            md += f"\n*Showing first {limit} files. Use `limit` parameter to see more.*\n"
 
-        return md
-    finally:
-        conn.close()
+# The md_* tools are typically called in sequence on the same document
+# (outline, then sections; list_tables, then get_table). Key the cached
+# content on (mtime_ns, size) so edits invalidate it automatically.
+@functools.lru_cache(maxsize=32)
+def _read_text(path_str: str, mtime_ns: int, size: int) -> str:
+    return Path(path_str).read_text(encoding="utf-8")
 
 
-# ============================================================================
-# Markdown Navigation Tools
-# ============================================================================
+@functools.lru_cache(maxsize=32)
+def _read_lines(path_str: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    return tuple(_read_text(path_str, mtime_ns, size).splitlines())
+
+
+def read_md_lines(full_path: Path) -> tuple[str, ...]:
+    """Read a markdown file as lines through the mtime-keyed cache."""
+    st = full_path.stat()
+    return _read_lines(str(full_path), st.st_mtime_ns, st.st_size)
+
+
+def read_md_text(full_path: Path) -> str:
+    """Read a markdown file through the mtime-keyed cache."""
+    st = full_path.stat()
+    return _read_text(str(full_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _extract_headings(path_str: str, mtime_ns: int, size: int) -> tuple[tuple[int, int, str], ...]:
+    """(line_idx, level, text) for each heading, extracted once per file version."""
+    return tuple(
+        (i, len(m.group(1)), m.group(2))
+        for i, line in enumerate(_read_lines(path_str, mtime_ns, size))
+        if (m := _HEADING_RE.match(line))
+    )
+
+
+def md_headings(full_path: Path) -> tuple[tuple[int, int, str], ...]:
+    """Headings of a markdown file through the mtime-keyed cache."""
+    st = full_path.stat()
+    return _extract_headings(str(full_path), st.st_mtime_ns, st.st_size)
 
 def md_outline(file_path: str) -> str:
     """
@@ -1239,30 +1494,20 @@ def md_outline(file_path: str) -> str:
         return f"❌ File not found: `{file_path}`"
 
     try:
-        content = full_path.read_text(encoding="utf-8")
+        headings = md_headings(full_path)
     except (IOError, UnicodeDecodeError) as e:
         return f"❌ Could not read file: {e}"
 
-    # Extract headings
-    headings = []
-    for line_num, line in enumerate(content.splitlines(), 1):
-        if line.startswith("#"):
-            # Count heading level
-            level = len(line) - len(line.lstrip("#"))
-            heading_text = line.lstrip("#").strip()
-            if heading_text:
-                headings.append((level, heading_text, line_num))
-
     if not headings:
         return f"No headings found in `{file_path}`"
 
     # Format as markdown outline
-    md = f"## Outline: `{file_path}`\n\n"
-    for level, text, line_num in headings:
+    parts = [f"## Outline: `{file_path}`\n\n"]
+    for line_idx, level, text in headings:
         indent = "  " * (level - 1)
-        md += f"{indent}- **{text}** (line {line_num})\n"
+        parts.append(f"{indent}- **{text}** (line {line_idx + 1})\n")
 
-    return md
+    return "".join(parts)
 
 
 def md_get_section(file_path: str, heading: str) -> str:
@@ -1277,36 +1522,33 @@ def md_get_section(file_path: str, heading: str) -> str:
         return f"❌ File not found: `{file_path}`"
 
     try:
-        lines = full_path.read_text(encoding="utf-8").splitlines()
+        lines = read_md_lines(full_path)
+        headings = md_headings(full_path)
     except (IOError, UnicodeDecodeError) as e:
         return f"❌ Could not read file: {e}"
 
-    # Find the heading (case-insensitive, flexible matching)
+    # Find the heading (case-insensitive, flexible matching) against the
+    # cached heading list: O(#headings), not a scan over every line
     heading_lower = heading.lower().strip()
     start_line = None
     heading_level = None
 
-    for i, line in enumerate(lines):
-        if line.startswith("#"):
-            level = len(line) - len(line.lstrip("#"))
-            text = line.lstrip("#").strip().lower()
-            if heading_lower in text or text in heading_lower:
-                start_line = i
-                heading_level = level
-                break
+    for line_idx, level, text in headings:
+        text = text.lower()
+        if heading_lower in text or text in heading_lower:
+            start_line = line_idx
+            heading_level = level
+            break
 
     if start_line is None:
         return f"❌ Heading not found: `{heading}` in `{file_path}`"
 
     # Find end of section (next same-level or higher heading)
     end_line = len(lines)
-    if heading_level is not None:
-        for i in range(start_line + 1, len(lines)):
-            if lines[i].startswith("#"):
-                level = len(lines[i]) - len(lines[i].lstrip("#"))
-                if level <= heading_level:
-                    end_line = i
-                    break
+    for line_idx, level, _ in headings:
+        if line_idx > start_line and level <= heading_level:
+            end_line = line_idx
+            break
 
     # Extract section content
     section_lines = lines[start_line:end_line]
@@ -1318,6 +1560,50 @@ def md_get_section(file_path: str, heading: str) -> str:
     return md
 
 
+def _scan_tables(lines: tuple[str, ...]) -> list[tuple[int, int, str]]:
+    """One pass over the lines yielding (header_idx, end_idx, header_text).
+
+    A table starts where a pipe-bearing header line is immediately
+    followed by a separator row (pipes plus dashes/colons); it ends at
+    the first subsequent line without a pipe. Each line is stripped once
+    and the scan resumes past the table it just consumed.
+    """
+    tables = []
+    prev_stripped = ""
+    prev_has_pipe = False
+    i = 0
+    n = len(lines)
+    while i < n:
+        stripped = lines[i].strip()
+        has_pipe = "|" in stripped
+        if (has_pipe and prev_has_pipe
+                and ("-" in stripped or ":" in stripped)):
+            header_idx = i - 1
+            end = i + 1
+            while end < n and "|" in lines[end]:
+                end += 1
+            tables.append((header_idx, end, prev_stripped))
+            i = end
+            prev_stripped = ""
+            prev_has_pipe = False
+            continue
+        prev_stripped = stripped
+        prev_has_pipe = has_pipe
+        i += 1
+    return tables
+
+
+@functools.lru_cache(maxsize=32)
+def _table_spans(path_str: str, mtime_ns: int, size: int) -> tuple[tuple[int, int, str], ...]:
+    return tuple(_scan_tables(_read_lines(path_str, mtime_ns, size)))
+
+
+def md_table_spans(full_path: Path) -> tuple[tuple[int, int, str], ...]:
+    """Table spans of a markdown file through the mtime-keyed cache."""
+    st = full_path.stat()
+    return _table_spans(str(full_path), st.st_mtime_ns, st.st_size)
+
+
 def md_list_tables(file_path: str) -> str:
     """
     List all markdown tables with context (surrounding text).
@@ -1330,49 +1616,42 @@ def md_list_tables(file_path: str) -> str:
         return f"❌ File not found: `{file_path}`"
 
     try:
-        lines = full_path.read_text(encoding="utf-8").splitlines()
+        lines = read_md_lines(full_path)
     except (IOError, UnicodeDecodeError) as e:
         return f"❌ Could not read file: {e}"
 
-    # Find tables (look for separator lines with |---|)
+    # Find tables in a single stripped pass (cached per file version)
     tables = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        # Table separator line pattern
-        if "|" in line and ("-" in line or ":" in line):
-            # Check if previous line is table header
-            if i > 0 and "|" in lines[i - 1]:
-                header_line = lines[i - 1].strip()
-                # Find preceding context (heading or text)
-                context = ""
-                for j in range(i - 1, max(0, i - 10), -1):
-                    if lines[j].startswith("#"):
-                        context = lines[j].lstrip("#").strip()
-                        break
-                    elif lines[j].strip():
-                        context = lines[j].strip()[:50] + "..." if len(lines[j].strip()) > 50 else lines[j].strip()
-
-                tables.append({
-                    "index": len(tables),
-                    "line": i + 1,
-                    "header": header_line,
-                    "context": context or "(no context)"
-                })
-        i += 1
+    for header_idx, _end_idx, header_line in md_table_spans(full_path):
+        sep_idx = header_idx + 1
+        # Find preceding context (heading or text)
+        context = ""
+        for j in range(sep_idx - 1, max(0, sep_idx - 10), -1):
+            if lines[j].startswith("#"):
+                context = lines[j].lstrip("#").strip()
+                break
+            elif lines[j].strip():
+                context = lines[j].strip()[:50] + "..." if len(lines[j].strip()) > 50 else lines[j].strip()
+
+        tables.append({
+            "index": len(tables),
+            "line": sep_idx + 1,
+            "header": header_line,
+            "context": context or "(no context)"
+        })
 
     if not tables:
         return f"No tables found in `{file_path}`"
 
     # Format as markdown
-    md = f"## Found {len(tables)} table(s) in `{file_path}`\n\n"
+    parts = [f"## Found {len(tables)} table(s) in `{file_path}`\n\n"]
     for table in tables:
-        md += f"{table['index'] + 1}. **Line {table['line']}** - {table['context']}\n"
-        md += f"   Header: `{table['header']}`\n\n"
+        parts.append(f"{table['index'] + 1}. **Line {table['line']}** - {table['context']}\n")
+        parts.append(f"   Header: `{table['header']}`\n\n")
 
-    md += "\nUse `md_get_table(file_path, index)` to get full table content.\n"
+    parts.append("\nUse `md_get_table(file_path, index)` to get full table content.\n")
 
-    return md
+    return "".join(parts)
 
 
 def md_get_table(file_path: str, index: int) -> str:
@@ -1387,38 +1666,20 @@ def md_get_table(file_path: str, index: int) -> str:
         return f"❌ File not found: `{file_path}`"
 
     try:
-        lines = full_path.read_text(encoding="utf-8").splitlines()
+        lines = read_md_lines(full_path)
+        spans = md_table_spans(full_path)
     except (IOError, UnicodeDecodeError) as e:
         return f"❌ Could not read file: {e}"
 
-    # Find tables
-    table_starts = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if "|" in line and ("-" in line or ":" in line):
-            if i > 0 and "|" in lines[i - 1]:
-                # Found table separator, header is at i-1
-                table_starts.append(i - 1)
-        i += 1
-
-    if not table_starts:
+    if not spans:
         return f"No tables found in `{file_path}`"
 
-    if index < 0 or index >= len(table_starts):
-        return f"❌ Table index {index} out of range (found {len(table_starts)} tables)"
-
-    # Extract table (from header until non-table line)
-    start = table_starts[index]
-    end = start
-    for i in range(start, len(lines)):
-        if "|" in lines[i]:
-            end = i + 1
-        else:
-            break
+    if index < 0 or index >= len(spans):
+        return f"❌ Table index {index} out of range (found {len(spans)} tables)"
 
-    table_lines = lines[start:end]
-    table_content = "\n".join(table_lines)
+    # Spans were computed (and end positions recorded) by the shared scan
+    start, end, _header = spans[index]
+    table_content = "\n".join(lines[start:end])
 
     md = f"## Table {index + 1} from `{file_path}` (line {start + 1})\n\n"
     md += table_content + "\n"
@@ -1438,65 +1699,125 @@ def md_list_figures(file_path: str) -> str:
         return f"❌ File not found: `{file_path}`"
 
     try:
-        content = full_path.read_text(encoding="utf-8")
+        content = read_md_text(full_path)
     except (IOError, UnicodeDecodeError) as e:
         return f"❌ Could not read file: {e}"
 
-    # Find markdown images: ![alt](path)
-    import re
+    # Find markdown images (![alt](path)) with one regex pass over the
+    # whole text; line numbers recovered by bisecting newline offsets
+    newline_offsets = []
+    pos = content.find("\n")
+    while pos != -1:
+        newline_offsets.append(pos)
+        pos = content.find("\n", pos + 1)
+
     figures = []
-    for line_num, line in enumerate(content.splitlines(), 1):
-        # Pattern: ![alt text](image/path.png)
-        matches = re.findall(r'!\[([^\]]*)\]\(([^\)]+)\)', line)
-        for alt_text, img_path in matches:
-            figures.append({
-                "line": line_num,
-                "alt": alt_text or "(no alt text)",
-                "path": img_path
-            })
+    for m in _IMG_RE.finditer(content):
+        alt_text, img_path = m.group(1), m.group(2)
+        figures.append({
+            "line": bisect.bisect_right(newline_offsets, m.start()) + 1,
+            "alt": alt_text or "(no alt text)",
+            "path": img_path
+        })
 
     if not figures:
         return f"No figures/images found in `{file_path}`"
 
     # Format as markdown
-    md = f"## Found {len(figures)} figure(s) in `{file_path}`\n\n"
+    parts = [f"## Found {len(figures)} figure(s) in `{file_path}`\n\n"]
     for i, fig in enumerate(figures, 1):
-        md += f"{i}. **Line {fig['line']}**: {fig['alt']}\n"
-        md += f"   Path: `{fig['path']}`\n\n"
+        parts.append(f"{i}. **Line {fig['line']}**: {fig['alt']}\n")
+        parts.append(f"   Path: `{fig['path']}`\n\n")
 
-    return md
+    return "".join(parts)
 
 
-async def periodic_staleness_check():
-    """Periodically check if reindexing is needed.
+def prefault_db():
+    """Ask the kernel to pull the database into page cache (Linux/macOS).
 
-    Uses full_check=True to detect new/deleted files via filesystem walk.
-    This is expensive on large repos but runs in the background every 60s.
+    Cold-start queries otherwise fault in B-tree pages one at a time;
+    WILLNEED starts readahead for the whole file up front.
     """
-    while True:
-        await asyncio.sleep(STALENESS_CHECK_INTERVAL)
+    db_path = get_db_path()
+    if not db_path.exists() or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(db_path, os.O_RDONLY)
         try:
-            is_indexing = _indexing_process is not None and _indexing_process.poll() is None
-            if not is_indexing:
-                stale, reason = is_stale(full_check=True)
-                if stale:
-                    logger.info(f"Index is stale ({reason}), starting background reindex")
-                    index_in_background()
-        except Exception as e:
-            logger.warning(f"Staleness check failed: {e}")
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
 
 
-async def periodic_watchdog_check():
-    """Run watchdog every 60 seconds to detect hung indexing and resource limit issues."""
+# Tool dispatch table: O(1) lookup instead of an if/elif ladder, with the
+# sync handlers hopped onto worker threads so the stdio loop stays free
+async def _handle_wait_for_index(a: dict):
+    success, msg = await wait_for_indexing(timeout_seconds=a.get("timeout_seconds", 60))
+    return {"success": success, "message": msg}
+
+
+async def _handle_save_session_context(a: dict):
+    import context_saver
+    result = await asyncio.to_thread(
+        context_saver.save_session_context,
+        project_root=str(get_project_root()),
+        **a
+    )
+    # Check for pending git-based update trigger
+    _check_update_trigger()
+    return result
+
+
+_TOOL_HANDLERS = {
+    "search_symbols": lambda a: asyncio.to_thread(
+        search_symbols, pattern=a["pattern"], kind=a.get("kind"), limit=a.get("limit", 20)),
+    "get_file_symbols": lambda a: asyncio.to_thread(get_file_symbols, file=a["file"]),
+    "get_symbol_content": lambda a: asyncio.to_thread(
+        get_symbol_content, name=a["name"], kind=a.get("kind")),
+    "reindex_repo_map": lambda a: asyncio.to_thread(reindex_repo_map, force=a.get("force", False)),
+    "repo_map_status": lambda a: asyncio.to_thread(repo_map_status),
+    "wait_for_index": _handle_wait_for_index,
+    "list_files": lambda a: asyncio.to_thread(
+        list_files, pattern=a.get("pattern"), limit=a.get("limit", 100)),
+    "md_outline": lambda a: asyncio.to_thread(md_outline, file_path=a["file_path"]),
+    "md_get_section": lambda a: asyncio.to_thread(
+        md_get_section, file_path=a["file_path"], heading=a["heading"]),
+    "md_list_tables": lambda a: asyncio.to_thread(md_list_tables, file_path=a["file_path"]),
+    "md_get_table": lambda a: asyncio.to_thread(
+        md_get_table, file_path=a["file_path"], index=a["index"]),
+    "md_list_figures": lambda a: asyncio.to_thread(md_list_figures, file_path=a["file_path"]),
+    "save_session_context": _handle_save_session_context,
+}
+
+
+async def periodic_maintenance():
+    """Run watchdog and staleness housekeeping on one 60s timer.
+
+    The watchdog reaps/kills indexing subprocesses; the staleness probe
+    uses full_check=True to detect new/deleted files via filesystem walk
+    (expensive on large repos, hence backgrounded). One loop instead of
+    two halves the wakeups and keeps the checks ordered: reap first, then
+    decide whether to reindex.
+    """
     while True:
-        await asyncio.sleep(60)
+        await asyncio.sleep(STALENESS_CHECK_INTERVAL)
         try:
             # Check for completed subprocess and log resource limit issues
             check_subprocess_exit_status()
-            # Check for hung processes
-            check_indexing_watchdog()
+            # Check for hung processes (SQLite reads, off the loop)
+            await asyncio.to_thread(check_indexing_watchdog)
+
+            if not _is_indexing():
+                # The full-check walk can block for hundreds of ms on big
+                # repos; keep the stdio loop responsive while it runs
+                stale, reason = await asyncio.to_thread(is_stale, True)
+                if stale:
+                    logger.info(f"Index is stale ({reason}), starting background reindex")
+                    index_in_background()
         except Exception as e:
-            logger.warning(f"Watchdog check failed: {e}")
+            logger.warning(f"Periodic maintenance failed: {e}")
 
 
 async def main():
@@ -1516,17 +1837,19 @@ async def main():
 
     # Check if indexing needed on startup
     try:
-        stale, reason = is_stale()
+        stale, reason = await asyncio.to_thread(is_stale)
         if stale:
             logger.info(f"Index is stale on startup ({reason}), starting background reindex")
             index_in_background()
     except Exception as e:
         logger.warning(f"Startup staleness check failed: {e}")
 
+    # Warm the page cache so the first tool calls don't fault per page
+    prefault_db()
+
     # Start periodic checks (keep handles so we can cancel on shutdown)
     background_tasks = [
-        asyncio.create_task(periodic_staleness_check()),
-        asyncio.create_task(periodic_watchdog_check()),
+        asyncio.create_task(periodic_maintenance()),
     ]
 
     logger.info("MCP Server ready, waiting for tool calls...")
@@ -8,10 +8,19 @@ Plugin configuration validation tests.
 Ensures plugin.json, hooks.json, and all referenced files are properly configured.
 """
 
+import contextlib
+import functools
+import io
 import json
+import os
 import sys
 from pathlib import Path
-import re
+
+try:
+    # C JSON parser, 2-5x faster than stdlib; tests fall back cleanly
+    import orjson
+except ImportError:
+    orjson = None
 
 PROJECT_ROOT = Path(__file__).parent.parent
 PLUGIN_ROOT = PROJECT_ROOT / ".claude-plugin"
@@ -19,9 +28,62 @@ HOOKS_ROOT = PROJECT_ROOT / "hooks"
 SCRIPTS_ROOT = PROJECT_ROOT / "scripts"
 SERVERS_ROOT = PROJECT_ROOT / "servers"
 
+# Config paths built once; every test and loader reuses them
+PLUGIN_JSON = PLUGIN_ROOT / "plugin.json"
+HOOKS_JSON = HOOKS_ROOT / "hooks.json"
+MARKETPLACE_JSON = PLUGIN_ROOT / "marketplace.json"
+
 # Note: hooks are autodiscovered from hooks/hooks.json, NOT in plugin.json
 REQUIRED_PLUGIN_FIELDS = ["name", "version", "description", "author", "keywords", "repository"]
 VALID_HOOK_TYPES = ["SessionStart", "SessionEnd", "PreCompact", "Stop", "PreToolUse", "PostToolUse", "UserPromptSubmit", "Notification", "SubagentStart", "SubagentStop"]
+VALID_HOOK_TYPES_SET = frozenset(VALID_HOOK_TYPES)
+
+# Per-item diagnostics (and their json.dumps formatting) are opt-in; CI
+# runs that only read PASS/FAIL skip the serialization work
+VERBOSE = os.environ.get("PLUGIN_TEST_VERBOSE") == "1"
+
+
+def is_semver(version: str) -> bool:
+    """X.Y.Z with all-ASCII-digit components, no regex engine involved."""
+    parts = version.split(".")
+    return len(parts) == 3 and all(p.isascii() and p.isdigit() for p in parts)
+
+
+# Several tests consume the same config files; parse each once per run
+@functools.lru_cache(maxsize=None)
+def load_json(path: Path) -> dict:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path) as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def _dir_entries(dir_path: str) -> frozenset:
+    """Names in a directory, listed once — one getdents instead of N stats."""
+    try:
+        with os.scandir(dir_path) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+
+
+def path_exists(path: str) -> bool:
+    """Existence via the parent-directory snapshot."""
+    dir_path, name = os.path.split(path)
+    return name in _dir_entries(dir_path)
+
+
+def load_plugin() -> dict:
+    return load_json(PLUGIN_JSON)
+
+
+def load_hooks() -> dict:
+    return load_json(HOOKS_JSON)
+
+
+def load_marketplace() -> dict:
+    return load_json(MARKETPLACE_JSON)
 
 def test_plugin_json_required_fields():
     """Validate plugin.json has all required fields."""
@@ -29,13 +91,11 @@ def test_plugin_json_required_fields():
     print("TEST 1: plugin.json required fields")
     print("=" * 60)
 
-    plugin_path = PLUGIN_ROOT / "plugin.json"
-    if not plugin_path.exists():
-        print(f"❌ FAIL: plugin.json not found at {plugin_path}")
+    if not PLUGIN_JSON.exists():
+        print(f"❌ FAIL: plugin.json not found at {PLUGIN_JSON}")
         return False
 
-    with open(plugin_path) as f:
-        plugin = json.load(f)
+    plugin = load_plugin()
 
     missing = [field for field in REQUIRED_PLUGIN_FIELDS if field not in plugin]
     if missing:
@@ -43,12 +103,13 @@ def test_plugin_json_required_fields():
         return False
 
     print("✅ PASS: All required fields present")
-    for field in REQUIRED_PLUGIN_FIELDS:
-        value = plugin[field]
-        if isinstance(value, dict):
-            print(f"  ✓ {field}: {json.dumps(value)}")
-        else:
-            print(f"  ✓ {field}: {value}")
+    if VERBOSE:
+        for field in REQUIRED_PLUGIN_FIELDS:
+            value = plugin[field]
+            if isinstance(value, dict):
+                print(f"  ✓ {field}: {json.dumps(value)}")
+            else:
+                print(f"  ✓ {field}: {value}")
     return True
 
 def test_hooks_json_exists():
@@ -59,14 +120,12 @@ def test_hooks_json_exists():
 
     # Hooks are autodiscovered from hooks/hooks.json at plugin root
     # NOT configured in plugin.json
-    hooks_path = HOOKS_ROOT / "hooks.json"
-
-    if not hooks_path.exists():
-        print(f"❌ FAIL: hooks/hooks.json not found at {hooks_path}")
+    if not HOOKS_JSON.exists():
+        print(f"❌ FAIL: hooks/hooks.json not found at {HOOKS_JSON}")
         print("  Hooks won't load - Claude Code autodiscovers from hooks/hooks.json")
         return False
 
-    print(f"✅ PASS: hooks/hooks.json exists at {hooks_path}")
+    print(f"✅ PASS: hooks/hooks.json exists at {HOOKS_JSON}")
     return True
 
 def test_hooks_json_structure():
@@ -75,20 +134,18 @@ def test_hooks_json_structure():
     print("TEST 3: hooks.json structure and hook types")
     print("=" * 60)
 
-    hooks_path = HOOKS_ROOT / "hooks.json"
-    if not hooks_path.exists():
-        print(f"❌ FAIL: hooks.json not found at {hooks_path}")
+    if not HOOKS_JSON.exists():
+        print(f"❌ FAIL: hooks.json not found at {HOOKS_JSON}")
         return False
 
-    with open(hooks_path) as f:
-        hooks_config = json.load(f)
+    hooks_config = load_hooks()
 
     if "hooks" not in hooks_config:
         print("❌ FAIL: 'hooks' key missing from hooks.json")
         return False
 
     hooks = hooks_config["hooks"]
-    invalid_types = [hook_type for hook_type in hooks.keys() if hook_type not in VALID_HOOK_TYPES]
+    invalid_types = sorted(hooks.keys() - VALID_HOOK_TYPES_SET)
 
     if invalid_types:
         print(f"❌ FAIL: Invalid hook types: {', '.join(invalid_types)}")
@@ -96,52 +153,66 @@ def test_hooks_json_structure():
         return False
 
     print(f"✅ PASS: All hook types valid ({len(hooks)} hook types defined)")
-    for hook_type in hooks.keys():
-        print(f"  ✓ {hook_type}")
+    if VERBOSE:
+        for hook_type in hooks.keys():
+            print(f"  ✓ {hook_type}")
     return True
 
+def _iter_commands(hooks_config: dict):
+    """Yield (hook_type, command) pairs from the nested hooks structure."""
+    for hook_type, hook_configs in hooks_config["hooks"].items():
+        for config in hook_configs:
+            for hook in config.get("hooks", ()):
+                if hook.get("type") == "command":
+                    yield hook_type, hook["command"]
+
+
 def test_hook_scripts_exist():
     """Verify all scripts referenced in hooks.json exist."""
     print("\n" + "=" * 60)
     print("TEST 4: Hook scripts existence")
     print("=" * 60)
 
-    hooks_path = HOOKS_ROOT / "hooks.json"
-    with open(hooks_path) as f:
-        hooks_config = json.load(f)
+    hooks_config = load_hooks()
+
+    # Gather candidates first, then resolve them against cached directory
+    # snapshots — no per-script stat() calls at all
+    candidates = []  # (hook_type, project-relative path, plugin fallback or None)
+    for hook_type, cmd in _iter_commands(hooks_config):
+        # Resolve ${CLAUDE_PLUGIN_ROOT} (always a prefix, so one
+        # removeprefix replaces the scan + replace pair)
+        rel_path = cmd.removeprefix("${CLAUDE_PLUGIN_ROOT}/")
+        if rel_path != cmd:
+            # Extract just the script path (first part before any arguments)
+            rel_path = rel_path.split()[0]
+            candidates.append((hook_type,
+                               os.path.join(str(PROJECT_ROOT), rel_path),
+                               os.path.join(str(PLUGIN_ROOT), rel_path)))
+        else:
+            candidates.append((hook_type, cmd.split()[0], None))
+
+    def resolve(candidate):
+        hook_type, project_path, plugin_path = candidate
+        # Check both locations (set lookups against directory snapshots)
+        if path_exists(project_path):
+            return hook_type, project_path, True
+        if plugin_path is not None and path_exists(plugin_path):
+            return hook_type, plugin_path, True
+        # Neither exists, record as missing (under the project path)
+        return hook_type, project_path, False
+
+    # Dedup before resolving: the same script is commonly wired into
+    # several hook types and should be checked once, not once per hook
+    unique_candidates = {}
+    for hook_type, project_path, plugin_path in candidates:
+        unique_candidates.setdefault(project_path, (hook_type, project_path, plugin_path))
 
     missing_scripts = []
     checked_scripts = set()
-
-    for hook_type, hook_configs in hooks_config["hooks"].items():
-        for config in hook_configs:
-            if "hooks" in config:
-                for hook in config["hooks"]:
-                    if hook.get("type") == "command":
-                        cmd = hook["command"]
-                        # Resolve ${CLAUDE_PLUGIN_ROOT}
-                        if "${CLAUDE_PLUGIN_ROOT}" in cmd:
-                            rel_path = cmd.replace("${CLAUDE_PLUGIN_ROOT}/", "")
-                            # Extract just the script path (first part before any arguments)
-                            rel_path = rel_path.split()[0]
-                            script_path_project = PROJECT_ROOT / rel_path
-                            script_path_plugin = PLUGIN_ROOT / rel_path
-
-                            # Check both locations
-                            if script_path_project.exists():
-                                script_path = script_path_project
-                            elif script_path_plugin.exists():
-                                script_path = script_path_plugin
-                            else:
-                                # Neither exists, record as missing
-                                script_path = script_path_project
-                        else:
-                            script_path = Path(cmd.split()[0])
-
-                        if script_path not in checked_scripts:
-                            checked_scripts.add(script_path)
-                            if not script_path.exists():
-                                missing_scripts.append((hook_type, str(script_path)))
+    for hook_type, script_path, found in map(resolve, unique_candidates.values()):
+        checked_scripts.add(script_path)
+        if not found:
+            missing_scripts.append((hook_type, script_path))
 
     if missing_scripts:
         print(f"❌ FAIL: {len(missing_scripts)} missing script(s):")
@@ -150,8 +221,9 @@ def test_hook_scripts_exist():
         return False
 
     print(f"✅ PASS: All {len(checked_scripts)} referenced scripts exist")
-    for script in sorted(checked_scripts, key=str):
-        print(f"  ✓ {script.name}")
+    if VERBOSE:
+        for script in sorted(checked_scripts):
+            print(f"  ✓ {os.path.basename(script)}")
     return True
 
 def test_version_format():
@@ -160,14 +232,11 @@ def test_version_format():
     print("TEST 5: Version format (semver)")
     print("=" * 60)
 
-    plugin_path = PLUGIN_ROOT / "plugin.json"
-    with open(plugin_path) as f:
-        plugin = json.load(f)
+    plugin = load_plugin()
 
     version = plugin.get("version", "")
-    semver_pattern = r'^\d+\.\d+\.\d+$'
 
-    if not re.match(semver_pattern, version):
+    if not is_semver(version):
         print(f"❌ FAIL: Version '{version}' doesn't match semver format (X.Y.Z)")
         return False
 
@@ -180,29 +249,31 @@ def test_mcp_servers_exist():
     print("TEST 6: MCP server scripts existence")
     print("=" * 60)
 
-    plugin_path = PLUGIN_ROOT / "plugin.json"
-    with open(plugin_path) as f:
-        plugin = json.load(f)
+    plugin = load_plugin()
 
     if "mcpServers" not in plugin:
         print("⚠️  WARNING: No mcpServers defined")
         return True
 
     servers = plugin["mcpServers"]
-    missing_servers = []
 
+    server_candidates = []
     for server_name, config in servers.items():
         if "args" in config:
             # Find the script path in args (typically second arg after 'run')
             for arg in config["args"]:
-                if "${CLAUDE_PLUGIN_ROOT}" in arg:
-                    rel_path = arg.replace("${CLAUDE_PLUGIN_ROOT}/", "")
-                    server_path_project = PROJECT_ROOT / rel_path
-                    server_path_plugin = PLUGIN_ROOT / rel_path
+                rel_path = arg.removeprefix("${CLAUDE_PLUGIN_ROOT}/")
+                if rel_path != arg:
+                    server_candidates.append(
+                        (server_name,
+                         os.path.join(str(PROJECT_ROOT), rel_path),
+                         os.path.join(str(PLUGIN_ROOT), rel_path)))
 
-                    # Check both locations
-                    if not server_path_project.exists() and not server_path_plugin.exists():
-                        missing_servers.append((server_name, str(server_path_project)))
+    missing_servers = []
+    for server_name, project_path, plugin_path in server_candidates:
+        # Check both locations (set lookups against directory snapshots)
+        if not path_exists(project_path) and not path_exists(plugin_path):
+            missing_servers.append((server_name, project_path))
 
     if missing_servers:
         print(f"❌ FAIL: {len(missing_servers)} missing MCP server(s):")
@@ -211,8 +282,9 @@ def test_mcp_servers_exist():
         return False
 
     print(f"✅ PASS: All {len(servers)} MCP server script(s) exist")
-    for name in servers.keys():
-        print(f"  ✓ {name}")
+    if VERBOSE:
+        for name in servers.keys():
+            print(f"  ✓ {name}")
     return True
 
 def test_marketplace_version_match():
@@ -221,22 +293,14 @@ def test_marketplace_version_match():
     print("TEST 7: Marketplace/Plugin version consistency")
     print("=" * 60)
 
-    plugin_path = PLUGIN_ROOT / "plugin.json"
-    marketplace_path = PLUGIN_ROOT / "marketplace.json"
-
-    with open(plugin_path) as f:
-        plugin = json.load(f)
-    with open(marketplace_path) as f:
-        marketplace = json.load(f)
+    plugin = load_plugin()
+    marketplace = load_marketplace()
 
     plugin_version = plugin.get("version")
 
-    # Find our plugin in marketplace.json
-    our_plugin = None
-    for p in marketplace.get("plugins", []):
-        if p.get("name") == plugin.get("name"):
-            our_plugin = p
-            break
+    # Find our plugin in marketplace.json (indexed once, O(1) lookup)
+    plugins_by_name = {p.get("name"): p for p in marketplace.get("plugins", [])}
+    our_plugin = plugins_by_name.get(plugin.get("name"))
 
     if not our_plugin:
         print(f"❌ FAIL: Plugin '{plugin.get('name')}' not found in marketplace.json")
@@ -264,22 +328,27 @@ if __name__ == "__main__":
         test_marketplace_version_match,
     ]
 
-    print("\n" + "=" * 60)
-    print("PLUGIN CONFIGURATION VALIDATION TESTS")
-    print("=" * 60)
+    sys.stdout.write("\n" + "=" * 60 + "\nPLUGIN CONFIGURATION VALIDATION TESTS\n" + "=" * 60 + "\n")
 
-    results = [test() for test in tests]
+    # Buffer each test's prints and emit them in one write: dozens of
+    # line-buffered stdout flushes collapse to one syscall per test
+    results = []
+    for test in tests:
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            results.append(test())
+        sys.stdout.write(buf.getvalue())
 
-    print("\n" + "=" * 60)
-    print("SUMMARY")
-    print("=" * 60)
     passed = sum(results)
     total = len(results)
-    print(f"Passed: {passed}/{total}")
-
-    if passed == total:
-        print("✅ All tests passed!")
-        sys.exit(0)
-    else:
-        print(f"❌ {total - passed} test(s) failed")
-        sys.exit(1)
+    summary = [
+        "",
+        "=" * 60,
+        "SUMMARY",
+        "=" * 60,
+        f"Passed: {passed}/{total}",
+        "✅ All tests passed!" if passed == total else f"❌ {total - passed} test(s) failed",
+        "",
+    ]
+    sys.stdout.write("\n".join(summary))
+    sys.exit(0 if passed == total else 1)